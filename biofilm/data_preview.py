@@ -1,42 +1,19 @@
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
+from eps_biofilm.io_nufeb import read_data_file
+
 
 fname = "C:/Users/User/atom.in"
 
 def read_atom_file(fname):
-    xs, ys, zs = [], [], []
-    radii, types = [], []
-    with open(fname) as f:
-        lines = f.readlines()
-
-    for i, line in enumerate(lines):
-        if line.strip().startswith("Atoms"):
-            start = i + 2
-            break
-    else:
-        raise RuntimeError("Cannot find 'Atoms' section in file.")
-    
-    for line in lines[start:]:
-        parts = line.split()
-        if len(parts) < 7:
-            continue
-        t = int(parts[1])             
-        r = float(parts[2])           
-        x = float(parts[4])
-        y = float(parts[5])
-        z = float(parts[6])
-        types.append(t)
-        radii.append(r)
-        xs.append(x)
-        ys.append(y)
-        zs.append(z)
-    return xs, ys, zs, radii, types
+    frame, _ = read_data_file(fname)
+    return frame
 
 def main():
-    xs, ys, zs, radii, types = read_atom_file(fname)
+    frame = read_atom_file(fname)
 
-    sizes = [(r * 1e6)**2 for r in radii]
+    sizes = (frame.diameter * 1e6)**2
 
     fig = plt.figure(figsize=(6,6))
     ax = fig.add_subplot(111, projection='3d')
@@ -47,15 +24,12 @@ def main():
     ax.set_zlim(0, lim)
     ax.set_box_aspect((1,1,1))
 
-    unique_types = sorted(set(types))
+    unique_types = sorted(frame.type_counts())
     cmap = plt.get_cmap('tab10') 
     for idx, t in enumerate(unique_types):
-        xi = [x for x, tt in zip(xs, types) if tt == t]
-        yi = [y for y, tt in zip(ys, types) if tt == t]
-        zi = [z for z, tt in zip(zs, types) if tt == t]
-        si = [s for s, tt in zip(sizes, types) if tt == t]
-        ax.scatter(xi, yi, zi,
-                   s=si,
+        sel = frame.indices(t)
+        ax.scatter(frame.x[sel], frame.y[sel], frame.z[sel],
+                   s=sizes[sel],
                    color=cmap(idx),
                    label=f"Type {t}",
                    alpha=0.7,
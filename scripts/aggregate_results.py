@@ -1,31 +1,66 @@
 #!/usr/bin/env python
 """Aggregate raw NUFEB outputs into a single tidy table.
 
-This is a stub: adapt it to the real output layout of your runs.
+Every ``*.log`` (or compressed ``*.log.gz``/``.zst``/...) under the raw directory becomes one row of thermo summary
+statistics (see `eps_biofilm.metrics.summarise_thermo`). Results are cached
+in a manifest so that re-aggregation only parses new or changed logs.
 """
 
 from __future__ import annotations
 
+import argparse
+from functools import partial
 from pathlib import Path
+from typing import Sequence
 
 import pandas as pd
 
+from eps_biofilm.io_nufeb import PARSER_VERSION, find_logs, read_thermo
+from eps_biofilm.manifest import Manifest, map_files
+from eps_biofilm.metrics import summarise_thermo
+
+
+def summarise_log(path: Path, species: Sequence[str], thresholds: Sequence[float]) -> dict:
+    return dict(summarise_thermo(read_thermo(path), species, thresholds))
+
 
 def main() -> None:
-    raw_dir = Path("data/raw/example_sweep")
-    out_path = Path("data/processed/example_summary.csv")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw-dir", type=Path, default=Path("data/raw/example_sweep"))
+    parser.add_argument("--out", type=Path, default=Path("data/processed/example_summary.csv"))
+    parser.add_argument("--species", nargs="+", default=["v_ncross1", "v_ncross2"])
+    parser.add_argument("--threshold", type=float, nargs="+", default=[50.0])
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="SQLite result cache (default: .manifest.sqlite inside --raw-dir)."
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every log, ignoring the manifest.")
+    args = parser.parse_args()
+
+    log_paths = find_logs(args.raw_dir, recursive=True)
+    work = partial(summarise_log, species=tuple(args.species), thresholds=tuple(args.threshold))
+    kind = f"summary:v{PARSER_VERSION}:{','.join(args.species)}:{','.join(map(repr, args.threshold))}"
+
+    if args.no_cache:
+        summaries = map_files(work, log_paths, jobs=args.jobs)
+    else:
+        with Manifest(args.manifest or args.raw_dir / ".manifest.sqlite") as manifest:
+            summaries = map_files(work, log_paths, jobs=args.jobs, manifest=manifest, kind=kind)
 
-    # TODO: implement your parsing logic here.
-    # For now we emit a tiny dummy table just so downstream code has something to read.
     df = pd.DataFrame(
-        {
-            "sample_id": [0, 1],
-            "collapse_time": [10.0, 20.0],
-        }
+        [
+            {"sample_id": p.name.split(".")[0], "path": str(p.relative_to(args.raw_dir)), **s}
+            for p, s in zip(log_paths, summaries)
+        ]
     )
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_path, index=False)
-    print("[aggregate_results] Wrote", out_path)
+    if "collapse_step" in df:
+        df["collapse_step"] = df["collapse_step"].astype("Int64")
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(args.out, index=False)
+    print("[aggregate_results] Wrote", args.out, f"({len(df)} runs)")
 
 
 if __name__ == "__main__":
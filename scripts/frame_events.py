@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""Per-step birth, death and EPS-secretion event tables for dump series.
+
+Each run directory holding a ``dump*.vtu`` series gets one CSV of event
+counts and per-capita rates (see `eps_biofilm.events.event_series`). Runs
+are processed in parallel; frames within a run are streamed two at a time.
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Iterable
+
+from eps_biofilm.events import event_series
+from eps_biofilm.io_nufeb import iter_vtu_frames
+
+
+def run_events(dump_dir: Path, pattern: str, out_name: str) -> tuple[Path, int]:
+    table = event_series(iter_vtu_frames(dump_dir, pattern))
+    out = dump_dir / out_name
+    table.to_csv(out, index=False)
+    return out, len(table)
+
+
+def report(results: Iterable[tuple[Path, int]]) -> None:
+    for out, n in results:
+        print(f"[frame_events] {n} steps -> {out}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dump_dirs", type=Path, nargs="+", help="Run directories holding dump*.vtu series.")
+    parser.add_argument("--pattern", default="dump*.vtu")
+    parser.add_argument("--out-name", default="events.csv", help="File name written inside each run directory.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of runs processed in parallel.")
+    args = parser.parse_args()
+
+    func = partial(run_events, pattern=args.pattern, out_name=args.out_name)
+    if args.jobs <= 1:
+        report(map(func, args.dump_dirs))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            report(pool.map(func, args.dump_dirs))
+
+
+if __name__ == "__main__":
+    main()
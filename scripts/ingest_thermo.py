@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Convert NUFEB thermo tables into a partitioned Parquet archive.
+
+Each log becomes ``<out>/condition=<c>/param_set=<p>/seed=<s>/thermo.parquet``;
+condition and seed are taken from the file name (``eps12.log``,
+``neps_log/neps3.log``, ``cheps7.log``). Logs whose archive file is newer
+than the log are skipped. Two different logs that map to the same
+partition (e.g. ``eps1.log`` in two directories) are an error: ingest
+them in separate runs with their own ``--param-set``. Load the archive
+with `eps_biofilm.io_nufeb.load_thermo_archive`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from eps_biofilm.io_nufeb import archive_run_path, find_logs, parse_run_name, write_thermo_archive
+from eps_biofilm.manifest import file_digest, map_files
+
+
+def _ingest(job: Tuple[Path, Path]) -> int:
+    log_path, out_path = job
+    return write_thermo_archive(log_path, out_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("logs", type=Path, nargs="+", help="Log files or directories to scan recursively.")
+    parser.add_argument("--out", type=Path, default=Path("data/processed/thermo"), help="Archive root.")
+    parser.add_argument("--param-set", default="base", help="Parameter-set id for these logs.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--force", action="store_true", help="Rewrite partitions that are up to date.")
+    args = parser.parse_args()
+
+    log_paths = []
+    for p in args.logs:
+        log_paths.extend(find_logs(p, recursive=True) if p.is_dir() else [p])
+
+    targets: Dict[Path, List[Path]] = {}
+    skipped = []
+    for log_path in log_paths:
+        parsed = parse_run_name(log_path.name)
+        if parsed is None:
+            skipped.append(log_path)
+            continue
+        condition, seed = parsed
+        targets.setdefault(archive_run_path(args.out, condition, args.param_set, seed), []).append(log_path)
+
+    clashes = {}
+    for out_path, sources in targets.items():
+        if len(sources) > 1 and len({file_digest(p) for p in sources}) > 1:
+            clashes[out_path] = sources
+    if clashes:
+        for out_path, sources in clashes.items():
+            print(f"[ingest_thermo] {out_path.relative_to(args.out)}: " + ", ".join(map(str, sources)))
+        sys.exit(
+            f"[ingest_thermo] {len(clashes)} partitions would be written by different logs; "
+            "ingest those directories separately with their own --param-set"
+        )
+
+    jobs = []
+    for out_path, (log_path, *_) in targets.items():
+        if not args.force and out_path.exists() and out_path.stat().st_mtime >= log_path.stat().st_mtime:
+            continue
+        jobs.append((log_path, out_path))
+
+    rows = map_files(_ingest, jobs, jobs=args.jobs)
+    print(f"[ingest_thermo] Wrote {len(jobs)} partitions ({sum(rows)} rows) under {args.out}")
+    if skipped:
+        print(f"[ingest_thermo] Skipped {len(skipped)} logs without an eps/neps/cheps<seed> name")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Build a per-run performance table from NUFEB logs and rank the runs.
+
+Reads the ``Loop time`` line and ``MPI task timing breakdown`` of each log
+(see `eps_biofilm.perf`). Prints the runs with the worst load imbalance and
+the highest cost per atom-step, and writes the full table as CSV.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from eps_biofilm.io_nufeb import find_logs
+from eps_biofilm.manifest import Manifest
+from eps_biofilm.perf import performance_table, rank_runs
+
+REPORT_COLUMNS = [
+    "file",
+    "run",
+    "procs",
+    "steps",
+    "loop_time",
+    "imbalance",
+    "modify_imbalance",
+    "comm_pct",
+    "modify_pct",
+    "cost_per_atom_step",
+    "step_cpu_mean",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("logs", type=Path, nargs="+", help="Log files or directories to scan recursively.")
+    parser.add_argument("--out", type=Path, default=Path("data/processed/performance.csv"))
+    parser.add_argument("--top", type=int, default=10, help="Runs to show per ranking.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--manifest", type=Path, default=None, help="Optional SQLite result cache.")
+    args = parser.parse_args()
+
+    log_paths = []
+    for p in args.logs:
+        log_paths.extend(find_logs(p, recursive=True) if p.is_dir() else [p])
+
+    if args.manifest is None:
+        perf = performance_table(log_paths, jobs=args.jobs)
+    else:
+        with Manifest(args.manifest) as manifest:
+            perf = performance_table(log_paths, jobs=args.jobs, manifest=manifest)
+    if perf.empty:
+        print("[perf_report] No completed runs found.")
+        return
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    perf.to_csv(args.out, index=False)
+
+    cols = [c for c in REPORT_COLUMNS if c in perf]
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print("== Worst load imbalance (share of loop time waiting on the slowest rank) ==")
+        print(rank_runs(perf, "imbalance", args.top)[cols].to_string(index=False))
+        print()
+        print("== Highest cost per atom-step (core-seconds) ==")
+        print(rank_runs(perf, "cost_per_atom_step", args.top)[cols].to_string(index=False))
+        print()
+        print(f"Total: {perf['core_seconds'].sum() / 3600:.1f} core-hours over {len(perf)} runs")
+    print("[perf_report] Wrote", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,152 @@
 #!/usr/bin/env python
-"""Run a single NUFEB simulation from a prepared input file."""
+"""Run a single NUFEB simulation from a prepared input file.
+
+With ``--stop-on-collapse`` the thermo output is followed while the run is
+in progress, and the simulation is stopped as soon as the cross-feeders
+have collapsed (same rule as ``collect_lifetime.py``). The lifetime step is
+recorded in ``<log>.lifetime.json``.
+
+With ``--store`` the run is looked up in a content-addressed run store
+(`eps_biofilm.run_store`) first: if the same input script, data file and
+binary (and early-stop rule) have already been run, the stored run is
+reported instead of simulating again. Otherwise the run executes in a
+scratch directory that is added to the store when it finishes. Either
+way ``--log`` is left as a link to the stored log, and with
+``--stop-on-collapse`` the lifetime of the stored run is written to
+``<log>.lifetime.json`` as well.
+"""
 
 from __future__ import annotations
 
 import argparse
+import json
+import os
+import signal
 import subprocess
 from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from eps_biofilm.io_nufeb import follow_thermo
+from eps_biofilm.metrics import CollapseDetector
+from eps_biofilm.run_store import SCRIPT_NAME, RunStore, run_key
+
+
+def terminate(proc: subprocess.Popen, grace: float) -> None:
+    """Ask the run (and its MPI ranks) to stop, then kill it after `grace` seconds."""
+
+    if proc.poll() is not None:
+        return
+    if hasattr(os, "killpg"):
+        os.killpg(proc.pid, signal.SIGTERM)
+    else:
+        proc.terminate()
+    try:
+        proc.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+        proc.wait()
+
+
+def follow_run(cmd: List[str], log: Path, args: argparse.Namespace, cwd: Optional[Path] = None) -> Dict[str, Any]:
+    """Run `cmd` while following `log`, stopping it once the cross-feeders have collapsed.
+
+    If a thermo block lacks one of the ``--columns``, following stops with
+    a warning and the run goes on to its end.
+    """
+
+    if log.exists():
+        log.unlink()  # do not mistake a previous run's rows for this one
+    detector = CollapseDetector(args.columns, args.threshold, args.patience)
+    proc = subprocess.Popen(cmd, cwd=cwd, start_new_session=True)
+    try:
+        for row in follow_thermo(log, lambda: proc.poll() is None, args.poll_interval):
+            missing = detector.missing(row)
+            if missing:
+                print(
+                    f"[run_single_sim] Warning: thermo output has no {', '.join(missing)} column(s); "
+                    "no longer watching for collapse."
+                )
+                break
+            if detector.update(row) is not None:
+                print(f"[run_single_sim] Collapse at step {detector.lifetime}; stopping the run.")
+                terminate(proc, args.grace)
+                break
+    except BaseException:
+        terminate(proc, args.grace)
+        raise
+
+    returncode = proc.wait()
+    return {
+        "lifetime_step": detector.lifetime,
+        "stopped_early": detector.lifetime is not None,
+        "returncode": returncode,
+    }
+
+
+def write_lifetime(log: Path, record: Mapping[str, Any]) -> None:
+    out = log.with_name(log.name + ".lifetime.json")
+    out.write_text(json.dumps(dict(record), indent=2) + "\n", encoding="utf-8")
+    print("[run_single_sim] Wrote", out)
+
+
+def stored_lifetime(args: argparse.Namespace, key: str, record: Mapping[str, Any]) -> Dict[str, Any]:
+    """The ``<log>.lifetime.json`` record of a stored run, for the input and log of this call."""
+
+    fields = {k: record.get(k) for k in ("lifetime_step", "stopped_early", "returncode")}
+    return {"input": str(args.input), "log": str(args.log), "key": key, **fields}
+
+
+def link_log(log: Path, target: Path) -> None:
+    """Point `log` at the stored run's log so it is found where an unstored run would put it."""
+
+    if log.is_symlink() or log.exists():
+        log.unlink()
+    log.symlink_to(target.resolve())
+
+
+def run_stored(args: argparse.Namespace) -> None:
+    """Serve the run from `args.store` if it was run before, else run it into the store.
+
+    Either way `args.log` ends up as a link to the stored log, next to its
+    ``.lifetime.json`` with ``--stop-on-collapse``.
+    """
+
+    # the domain decomposition (rank count) changes NUFEB's RNG streams and summation order
+    extra = {"np": args.np, "launcher": args.mpirun if args.np > 1 else None}
+    if args.stop_on_collapse:
+        extra.update(columns=args.columns, threshold=args.threshold, patience=args.patience)
+    store = RunStore(args.store)
+    key = run_key(args.input, args.lmp_bin, extra)
+    if store.has(key):
+        print(f"[run_single_sim] Cached run {key}: {store.path(key)}")
+        record = store.record(key)
+        link_log(args.log, store.path(key) / record["log"])
+        if args.stop_on_collapse:
+            write_lifetime(args.log, stored_lifetime(args, key, record))
+        return
+
+    work = store.stage(key, args.input)
+    cmd = [args.lmp_bin, "-in", SCRIPT_NAME, "-log", args.log.name]
+    if args.np > 1:
+        cmd = [args.mpirun, "-np", str(args.np)] + cmd
+    print("[run_single_sim] Running:", " ".join(cmd), "in", work)
+    if args.stop_on_collapse:
+        record = follow_run(cmd, work / args.log.name, args, cwd=work)
+    else:
+        record = {"returncode": subprocess.call(cmd, cwd=work)}
+    if record["returncode"] != 0 and not record.get("stopped_early"):
+        store.discard(work)
+        raise subprocess.CalledProcessError(record["returncode"], cmd)
+
+    record = {"input": str(args.input), "log": args.log.name, "np": args.np, **record}
+    dest = store.commit(key, work, record)
+    link_log(args.log, dest / args.log.name)
+    print("[run_single_sim] Stored run", key, "in", dest)
+    if args.stop_on_collapse:
+        write_lifetime(args.log, stored_lifetime(args, key, record))
 
 
 def main() -> None:
@@ -17,11 +158,50 @@ def main() -> None:
         default="lmp",
         help="LAMMPS/NUFEB binary name (must be on PATH)."
     )
+    parser.add_argument("--np", type=int, default=1, help="MPI ranks; >1 launches through --mpirun.")
+    parser.add_argument("--mpirun", type=str, default="mpirun", help="MPI launcher used when --np > 1.")
+    parser.add_argument("--log", type=Path, default=Path("log.lammps"), help="Log file written by LAMMPS.")
+    parser.add_argument(
+        "--stop-on-collapse",
+        action="store_true",
+        help="Follow the log and stop the run once all --columns are below --threshold."
+    )
+    parser.add_argument("--columns", nargs="+", default=["v_ncross1", "v_ncross2"])
+    parser.add_argument("--threshold", type=float, nargs="+", default=[50.0])
+    parser.add_argument(
+        "--patience",
+        type=int,
+        default=1,
+        help="Consecutive thermo rows that must satisfy the rule before stopping."
+    )
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between log polls.")
+    parser.add_argument("--grace", type=float, default=60.0, help="Seconds to wait after SIGTERM before SIGKILL.")
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Run store root; identical runs are served from it instead of re-simulating."
+    )
     args = parser.parse_args()
 
-    cmd = [args.lmp_bin, "-in", str(args.input)]
+    if args.store is not None:
+        run_stored(args)
+        return
+
+    cmd = [args.lmp_bin, "-in", str(args.input), "-log", str(args.log)]
+    if args.np > 1:
+        cmd = [args.mpirun, "-np", str(args.np)] + cmd
     print("[run_single_sim] Running:", " ".join(cmd))
-    subprocess.check_call(cmd)
+
+    if not args.stop_on_collapse:
+        subprocess.check_call(cmd)
+        return
+
+    record = {"input": str(args.input), "log": str(args.log), **follow_run(cmd, args.log, args)}
+    write_lifetime(args.log, record)
+
+    if not record["stopped_early"] and record["returncode"] != 0:
+        raise subprocess.CalledProcessError(record["returncode"], cmd)
 
 
 if __name__ == "__main__":
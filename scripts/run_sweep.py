@@ -1,28 +1,270 @@
 #!/usr/bin/env python
-"""Minimal skeleton for running a parameter sweep over NUFEB simulations."""
+"""Run a parameter sweep over NUFEB simulations.
+
+Samples ``n_samples`` parameter sets from the sweep config, renders one
+input per (sample, replicate) into ``<out>/inputs`` and runs each with
+``run_single_sim.py``. With ``--backend local`` several runs execute at
+once, each pinned to its own group of ``--ranks`` cores, so the node is
+filled without being oversubscribed (on small boxes, 4 x 16-rank runs on
+a 64-core node finish far sooner than 64-rank runs one after another).
+Start, finish and exit code of every run are appended to
+``<out>/sweep_state.jsonl``; re-running the same command resumes the
+sweep, skipping runs that already finished with the same input (runs
+whose input changed with the config are moved to
+``<out>/inputs/superseded/`` and run again).
+
+With ``--backend ray`` every run is a Ray task reserving ``--ranks``
+CPUs (see `eps_biofilm.ray_backend`); logs are summarised on the node
+that ran them and the summaries of all runs of the sweep, including
+those finished by earlier invocations, are written to ``<out>/summary.csv``.
+Without ``--ray-address`` (or ``RAY_ADDRESS``) a local Ray instance is
+started.
+
+With ``--adaptive`` the sweep compares the EPS and NEPS templates of the
+config's ``adaptive.arms`` instead: every condition (parameter sample)
+starts with ``adaptive.initial`` seeds per arm, and after each batch
+only the conditions whose EPS-vs-NEPS median lifetime difference is
+still unresolved get ``adaptive.batch`` more (see
+`eps_biofilm.adaptive`). Decisions are written to ``<out>/adaptive.csv``
+and run lifetimes to ``<out>/runs.csv`` after every batch.
+"""
 
 from __future__ import annotations
 
 import argparse
+import os
+import sys
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, List, Mapping
+
+import pandas as pd
+
+import eps_biofilm
+from eps_biofilm.adaptive import StoppingRule, evaluate, lifetime, next_batch
+from eps_biofilm.io_nufeb import read_thermo
+from eps_biofilm.metrics import summarise_thermo
+from eps_biofilm.nufeb_template import replicate_seeds
+from eps_biofilm.parameter_space import load_config, parameter_space, sample_parameters
+from eps_biofilm.sweep import SweepState, compile_sweep, cpu_groups, render_sweep, run_local, write_inputs
+
+RUN_SINGLE_SIM = Path(__file__).with_name("run_single_sim.py")
+
+
+def run_command(input_path: Path, args: argparse.Namespace) -> List[str]:
+    cmd = [
+        sys.executable, str(RUN_SINGLE_SIM),
+        "--input", str(input_path),
+        "--lmp-bin", args.lmp_bin,
+        "--np", str(args.ranks),
+        "--mpirun", args.mpirun,
+        "--log", str(input_path.with_suffix(".log").name),
+    ]
+    if args.stop_on_collapse:
+        cmd.append("--stop-on-collapse")
+    if args.store is not None:
+        cmd += ["--store", str(args.store.resolve())]
+    return cmd
+
+
+def report(event: Dict[str, Any], progress: Dict[str, int]) -> None:
+    if event["status"] == "started":
+        print(f"[run_sweep] start {event['job']} on cpus {event['group'][0]}-{event['group'][-1]}")
+        return
+    progress[event["status"]] += 1
+    print(
+        f"[run_sweep] {event['status']} {event['job']} (exit {event['returncode']}, {event['seconds']} s); "
+        f"{progress['finished']} ok, {progress['failed']} failed"
+    )
+
+
+def run_on_ray(
+    commands: Dict[str, List[str]],
+    keys: Dict[str, str],
+    input_dir: Path,
+    out_dir: Path,
+    state: SweepState,
+    args: argparse.Namespace,
+) -> None:
+    from eps_biofilm.ray_backend import run_ray
+
+    cwd = str(input_dir.resolve())
+    jobs = {name: (cmd, cwd, Path(name).with_suffix(".log").name) for name, cmd in commands.items()}
+    done = [job for job in state.done(keys) if job in jobs]
+    print(f"[run_sweep] {len(jobs)} runs, {len(done)} already finished; Ray tasks of {args.ranks} CPUs")
+
+    summaries = []
+    for summary in run_ray(jobs, args.ranks, state, address=args.ray_address, keys=keys):
+        summaries.append(summary)
+        print(
+            f"[run_sweep] {summary['job']}: exit {summary['returncode']}, "
+            f"collapse step {summary.get('collapse_step')} ({len(summaries)} done)"
+        )
+
+    out = out_dir / "summary.csv"
+    pd.DataFrame.from_records(summaries).to_csv(out, index=False)
+    failed = sum(s["returncode"] != 0 for s in summaries)
+    print(f"[run_sweep] Done: {len(summaries) - failed} finished, {failed} failed. Summaries: {out}")
+    if failed:
+        sys.exit(1)
+
+
+def run_adaptive(
+    config: Mapping[str, Any], n_samples: int, out_dir: Path, state: SweepState, args: argparse.Namespace
+) -> None:
+    spec = config.get("adaptive", {})
+    arms = spec.get("arms", {})
+    if set(arms) != {"eps", "neps"}:
+        sys.exit("[run_sweep] adaptive.arms must give the 'eps' and 'neps' templates")
+    rule = StoppingRule.from_config(spec)
+    compiled = {arm: (*compile_sweep(config, Path(path), partial=True), Path(path)) for arm, path in arms.items()}
+    samples = sample_parameters(parameter_space(config), n_samples, config.get("sampling", {}).get("seed"))
+    params = samples.to_dict("records")
+
+    input_dir = out_dir / "inputs"
+    groups = cpu_groups(args.ranks, args.cores)
+    replicates = {s: 0 for s in range(len(params))}
+    runs: List[Dict[str, Any]] = []
+    lifetimes: Dict[str, float] = {}
+    decisions = None
+    print(
+        f"[run_sweep] Adaptive: {len(params)} conditions x 2 arms, {rule.initial} seeds first, "
+        f"then +{rule.batch} up to {rule.max_replicates}; {rule.level:.4f} intervals"
+    )
+
+    for batch_no in count(1):
+        batch = next_batch(replicates, decisions, rule)
+        if not batch:
+            break
+        new = []
+        for arm, (script, template, path) in compiled.items():
+            rows = [
+                {"sample": s, "replicate": r, **params[s], **replicate_seeds(script, r)}
+                for s, reps in batch.items() for r in reps
+            ]
+            table = write_inputs(
+                script, template, path, rows, input_dir, prefix=f"{arm}_", finished=state.finished_keys()
+            )
+            new += [{**row, "arm": arm} for row in table.to_dict("records")]
+        runs += new
+        for s, reps in batch.items():
+            replicates[s] = reps[-1]
+
+        commands = {row["input"]: run_command(input_dir.resolve() / row["input"], args) for row in new}
+        keys = {row["input"]: row["key"] for row in new}
+        print(f"[run_sweep] Batch {batch_no}: {len(commands)} runs for {len(batch)} conditions")
+        progress = {"finished": 0, "failed": 0}
+        run_local(
+            commands, groups, state, cwd=input_dir, poll_interval=args.poll_interval,
+            on_event=lambda event: report(event, progress), keys=keys,
+        )
+
+        done = set(state.done(keys))
+        for row in new:
+            if row["input"] in done:
+                log = input_dir / Path(row["input"]).with_suffix(".log").name
+                lifetimes[row["input"]] = lifetime(summarise_thermo(read_thermo(log)))
+        table = pd.DataFrame.from_records(runs)
+        table["lifetime"] = table["input"].map(lifetimes)
+        table.to_csv(out_dir / "runs.csv", index=False)
+        decisions = evaluate(table, rule, config.get("sampling", {}).get("seed"), samples=replicates)
+        decisions.to_csv(out_dir / "adaptive.csv", index=False)
+        counts = decisions["decision"].value_counts()
+        print(f"[run_sweep] After batch {batch_no}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+        failed = decisions.loc[decisions["decision"] == "failed", "sample"].tolist()
+        if failed:
+            print(f"[run_sweep] Warning: conditions {failed} spent {rule.max_replicates} seeds without a usable lifetime in an arm")
+
+    total = sum(replicates.values()) * 2
+    print(
+        f"[run_sweep] Done: {total} runs instead of {len(params) * rule.max_replicates * 2} "
+        f"at a fixed {rule.max_replicates} seeds. Decisions: {out_dir / 'adaptive.csv'}"
+    )
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--config", required=True, help="YAML config for the sweep.")
-    parser.add_argument("--n-samples", type=int, default=8, help="Number of samples.")
+    parser.add_argument("--config", required=True, type=Path, help="YAML config for the sweep.")
+    parser.add_argument("--n-samples", type=int, default=None, help="Number of samples (default: sampling.n_samples).")
+    parser.add_argument(
+        "--replicates", type=int, default=None, help="Seed replicates per sample (default: sampling.replicates or 1)."
+    )
     parser.add_argument(
         "--backend",
         choices=["local", "ray"],
         default="local",
-        help="Execution backend (extend as needed).",
+        help="Execution backend."
     )
+    parser.add_argument("--out", type=Path, default=None, help="Sweep directory (default: simulation.output_dir).")
+    parser.add_argument("--ranks", type=int, default=None, help="MPI ranks per run (default: execution.ranks_per_job).")
+    parser.add_argument("--cores", type=int, default=None, help="Cores to use (default: all this process may use).")
+    parser.add_argument("--lmp-bin", type=str, default=None, help="NUFEB binary (default: execution.lmp_bin).")
+    parser.add_argument("--mpirun", type=str, default="mpirun", help="MPI launcher.")
+    parser.add_argument("--store", type=Path, default=None, help="Run store; identical runs are not re-simulated.")
+    parser.add_argument(
+        "--stop-on-collapse",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Stop runs once the cross-feeders collapse (default: execution.stop_on_collapse)."
+    )
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between checks on running jobs.")
+    parser.add_argument(
+        "--adaptive", action="store_true", help="Add EPS/NEPS seeds per condition until the comparison is resolved."
+    )
+    parser.add_argument("--ray-address", type=str, default=None, help="Ray cluster address (default: local instance).")
     args = parser.parse_args()
 
-    print("[run_sweep] This is a stub. Wire me up to your actual sweep logic.")
-    print("Config:", args.config)
-    print("n_samples:", args.n_samples)
-    print("backend:", args.backend)
+    config = load_config(args.config)
+    sim, sampling, execution = (config.get(k, {}) for k in ("simulation", "sampling", "execution"))
+    out_dir = args.out or Path(sim["output_dir"])
+    args.ranks = args.ranks or int(execution.get("ranks_per_job", 1))
+    args.lmp_bin = args.lmp_bin or execution.get("lmp_bin", "lmp")
+    if args.stop_on_collapse is None:
+        args.stop_on_collapse = bool(execution.get("stop_on_collapse", False))
+
+    # runs start inside the input directory; let them import this same package
+    package_root = str(Path(eps_biofilm.__file__).resolve().parents[1])
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")]))
+
+    state = SweepState(out_dir / "sweep_state.jsonl")
+    n_samples = args.n_samples or int(sampling.get("n_samples", 8))
+    if args.adaptive:
+        if args.backend != "local":
+            sys.exit("[run_sweep] --adaptive runs on the local backend only")
+        run_adaptive(config, n_samples, out_dir, state, args)
+        return
+
+    input_dir = out_dir / "inputs"
+    table = render_sweep(
+        config,
+        Path(sim["base_input_template"]),
+        input_dir,
+        n_samples,
+        args.replicates or int(sampling.get("replicates", 1)),
+        finished=state.finished_keys(),
+    )
+    commands = {name: run_command(input_dir.resolve() / name, args) for name in table["input"]}
+    keys = dict(zip(table["input"], table["key"]))
 
+    if args.backend == "ray":
+        run_on_ray(commands, keys, input_dir, out_dir, state, args)
+        return
+
+    groups = cpu_groups(args.ranks, args.cores)
+    print(
+        f"[run_sweep] {len(commands)} runs, {len(state.done(keys))} already finished; "
+        f"{len(groups)} at a time x {args.ranks} ranks"
+    )
+
+    progress = {"finished": 0, "failed": 0}
+    codes = run_local(
+        commands, groups, state, cwd=input_dir, poll_interval=args.poll_interval,
+        on_event=lambda event: report(event, progress), keys=keys,
+    )
+    failed = sorted(job for job, code in codes.items() if code != 0)
+    print(f"[run_sweep] Done: {len(codes) - len(failed)} finished, {len(failed)} failed. State: {state.path}")
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
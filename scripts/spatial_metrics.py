@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Per-frame contact and segregation metrics for a run's ``dump*.vtu`` series.
+
+See `eps_biofilm.spatial.frame_metrics` for the definitions. Frames are
+processed in parallel and cached in a manifest next to the dumps. With
+``--tracks``, contact-graph clusters are also followed through the series
+(`eps_biofilm.clusters.track_clusters`). For frames too large for one
+process, ``--slabs PX PY`` instead splits each frame into xy slabs that
+are analysed in parallel from shared memory (`eps_biofilm.domain`).
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from eps_biofilm.clusters import track_clusters, track_lifetimes
+from eps_biofilm.domain import slab_frame_metrics
+from eps_biofilm.io_nufeb import iter_vtu_frames
+from eps_biofilm.manifest import Manifest
+from eps_biofilm.spatial import segregation_series
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dump_dir", type=Path, help="Directory holding the dump*.vtu series.")
+    parser.add_argument("--pattern", default="dump*.vtu")
+    parser.add_argument("--out", type=Path, default=None, help="Output CSV (default: <dump_dir>/spatial_metrics.csv).")
+    parser.add_argument("--tol", type=float, default=1e-7, help="Contact tolerance added to the sum of radii (m).")
+    parser.add_argument("--seg-radius", type=float, default=5e-6, help="Neighbourhood radius of the segregation index (m).")
+    parser.add_argument("--box", type=float, nargs=2, default=None, metavar=("LX", "LY"),
+                        help="Periodic box lengths in x and y (m), e.g. 6e-5 6e-5.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--slabs", type=int, nargs=2, default=None, metavar=("PX", "PY"),
+                        help="Decompose each frame into PX x PY slabs (needs --box); --jobs then counts slab workers.")
+    parser.add_argument("--tracks", action="store_true",
+                        help="Also write cluster_tracks.csv and cluster_lifetimes.csv next to --out.")
+    parser.add_argument("--min-size", type=int, default=2, help="Smallest cluster written by --tracks.")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every frame, ignoring the manifest.")
+    args = parser.parse_args()
+
+    out = args.out or args.dump_dir / "spatial_metrics.csv"
+    kwargs = dict(pattern=args.pattern, tol=args.tol, seg_radius=args.seg_radius, box=args.box, jobs=args.jobs)
+    if args.slabs is not None:
+        if args.box is None:
+            parser.error("--slabs needs --box")
+        rows = [
+            {"step": step, **slab_frame_metrics(frame, args.box, tuple(args.slabs), args.tol, args.seg_radius, args.jobs)}
+            for step, frame in iter_vtu_frames(args.dump_dir, args.pattern)
+        ]
+        table = pd.DataFrame.from_records(rows)
+    elif args.no_cache:
+        table = segregation_series(args.dump_dir, **kwargs)
+    else:
+        with Manifest(args.dump_dir / ".manifest.sqlite") as manifest:
+            table = segregation_series(args.dump_dir, manifest=manifest, **kwargs)
+
+    if table.empty:
+        print("[spatial_metrics] No dumps found in", args.dump_dir)
+        return
+    table.to_csv(out, index=False)
+    print(f"[spatial_metrics] {len(table)} frames -> {out}")
+
+    if args.tracks:
+        frames = iter_vtu_frames(args.dump_dir, args.pattern)
+        tracks = track_clusters(frames, tol=args.tol, box=args.box, min_size=args.min_size)
+        tracks.to_csv(out.with_name("cluster_tracks.csv"), index=False)
+        track_lifetimes(tracks).to_csv(out.with_name("cluster_lifetimes.csv"), index=False)
+        print(f"[spatial_metrics] {tracks['track'].nunique()} cluster tracks -> {out.with_name('cluster_tracks.csv')}")
+
+
+if __name__ == "__main__":
+    main()
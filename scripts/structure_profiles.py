@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""Biofilm height, roughness and vertical profiles of a run as a NetCDF cube.
+
+Reads the ``dump*.vtu`` series once (see `eps_biofilm.structure`) and, if
+``--grid-dir`` holds the ``dump_%_*.vti`` grid dumps of the same run, adds
+the xy-averaged substrate fields per layer.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from eps_biofilm.io_grid import open_grid_dataset
+from eps_biofilm.io_nufeb import iter_vtu_frames
+from eps_biofilm.structure import GRID_SPACING, structure_cube
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dump_dir", type=Path, help="Directory holding the dump*.vtu series.")
+    parser.add_argument("--pattern", default="dump*.vtu")
+    parser.add_argument("--grid-dir", type=Path, default=None, help="Directory holding the grid .vti dumps.")
+    parser.add_argument("--box", type=float, nargs=3, default=[6e-5, 6e-5, 6e-5], metavar=("LX", "LY", "LZ"),
+                        help="Domain size (m), as in the read_data file.")
+    parser.add_argument("--spacing", type=float, default=GRID_SPACING, help="Grid spacing (m).")
+    parser.add_argument("--out", type=Path, default=None, help="Output NetCDF (default: <dump_dir>/structure.nc).")
+    args = parser.parse_args()
+
+    grid = open_grid_dataset(args.grid_dir) if args.grid_dir is not None else None
+    cube = structure_cube(iter_vtu_frames(args.dump_dir, args.pattern), args.box, args.spacing, grid)
+    out = args.out or args.dump_dir / "structure.nc"
+    cube.to_netcdf(out)
+    print(f"[structure_profiles] {cube.sizes['time']} frames -> {out}")
+
+
+if __name__ == "__main__":
+    main()
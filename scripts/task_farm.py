@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""Pack many small NUFEB runs into one PBS/Slurm allocation.
+
+``script`` writes a job script for one big allocation; submitting it runs
+``run`` inside the allocation, which splits the nodes into groups of
+``--ranks`` slots and hands the inputs to free groups until all are done::
+
+    python scripts/task_farm.py script --scheduler pbs --nodes 10 --ppn 16 --ranks 16 \\
+        --inputs data/raw/example_sweep/inputs/*.nufeb -o farm.pbs
+    qsub farm.pbs
+
+``run --scheduler local`` runs the same farm on this machine with plain
+``mpirun``, each group pinned to its own cores, for testing without a
+scheduler. Inside an allocation each group gets an Open MPI rankfile
+with its own slots; ``--bind-to-none`` uses hostfiles and unbound ranks
+instead. Progress goes to
+``<farm-dir>/farm_state.jsonl``; a re-submitted farm skips inputs that
+already finished, unless their contents changed since.
+"""
+
+from __future__ import annotations
+
+import argparse
+import shlex
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import eps_biofilm
+from eps_biofilm.manifest import file_digest
+from eps_biofilm.sweep import SweepState, cpu_groups, run_local
+from eps_biofilm.task_farm import HOST_SOURCES, farm_command, job_script, local_placement, placements, rank_groups
+
+
+def read_inputs(paths: List[Path]) -> List[Path]:
+    """Input scripts given directly, or listed one per line in ``.txt`` files."""
+
+    inputs = []
+    for p in paths:
+        if p.suffix == ".txt":
+            inputs += [Path(line.strip()) for line in p.read_text().splitlines() if line.strip()]
+        else:
+            inputs.append(p)
+    return [p.resolve() for p in inputs]
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.scheduler == "local":
+        groups: List[Any] = cpu_groups(args.ranks, args.cores)
+        place, where = local_placement, "this machine"
+    else:
+        hosts = HOST_SOURCES[args.scheduler]()
+        host_groups = rank_groups(hosts, args.ranks)
+        if not host_groups:
+            sys.exit(f"[task_farm] {sum(n for _, n in hosts)} slots cannot hold one {args.ranks}-rank group")
+        groups = placements(host_groups, args.farm_dir / "hostfiles", bind=not args.bind_to_none)
+        place, where = (lambda options: options), f"{len(hosts)} hosts"
+
+    mpirun_args = shlex.split(args.mpirun_args)
+    inputs = read_inputs(args.inputs)
+    commands = {}
+    for p in inputs:
+        build = farm_command(p, args.ranks, args.lmp_bin, args.mpirun, mpirun_args)
+        commands[str(p)] = lambda group, build=build: build(place(group))
+    keys = {str(p): file_digest(p) for p in inputs}
+    state = SweepState(args.farm_dir / "farm_state.jsonl")
+    print(
+        f"[task_farm] {len(inputs)} inputs ({len(state.done(keys))} done before) on "
+        f"{len(groups)} groups x {args.ranks} ranks on {where}"
+    )
+
+    counts: Dict[str, int] = {"finished": 0, "failed": 0}
+
+    def report(event: Dict[str, Any]) -> None:
+        if event["status"] in counts:
+            counts[event["status"]] += 1
+            print(
+                f"[task_farm] {event['status']} {Path(event['job']).name} (exit {event['returncode']}, "
+                f"{event['seconds']} s); {counts['finished']} ok, {counts['failed']} failed"
+            )
+
+    codes = run_local(
+        commands, groups, state, poll_interval=args.poll_interval, on_event=report,
+        pin=args.scheduler == "local", keys=keys,
+    )
+    failed = sum(code != 0 for code in codes.values())
+    print(f"[task_farm] Done: {len(codes) - failed} finished, {failed} failed. State: {state.path}")
+    if failed:
+        sys.exit(1)
+
+
+def write_script(args: argparse.Namespace) -> None:
+    farm_args = [
+        "--ranks", str(args.ranks),
+        "--lmp-bin", args.lmp_bin,
+        "--mpirun", args.mpirun,
+        f"--mpirun-args={args.mpirun_args}",
+        *(["--bind-to-none"] if args.bind_to_none else []),
+        "--farm-dir", str(args.farm_dir.resolve()),
+        "--inputs", *(str(p) for p in read_inputs(args.inputs)),
+    ]
+    text = job_script(
+        args.scheduler,
+        args.name,
+        args.nodes,
+        args.ppn,
+        args.walltime,
+        Path.cwd(),
+        Path(__file__),
+        sys.executable,
+        str(Path(eps_biofilm.__file__).resolve().parents[1]),
+        farm_args,
+        args.module,
+    )
+    args.output.write_text(text)
+    submit = "qsub" if args.scheduler == "pbs" else "sbatch"
+    print(f"[task_farm] Wrote {args.output}; submit with: {submit} {args.output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--inputs", type=Path, nargs="+", required=True, help="Input scripts or .txt lists of them.")
+    common.add_argument("--ranks", type=int, default=16, help="MPI ranks per run.")
+    common.add_argument("--lmp-bin", type=str, default="lmp", help="NUFEB binary.")
+    common.add_argument("--mpirun", type=str, default="mpirun", help="MPI launcher.")
+    common.add_argument("--mpirun-args", type=str, default="", help="Extra launcher options, e.g. '--mca btl ^openib'.")
+    common.add_argument(
+        "--bind-to-none", action="store_true",
+        help="Use hostfiles and unbound ranks instead of per-group rankfiles (cluster only).",
+    )
+    common.add_argument("--farm-dir", type=Path, default=Path("farm"), help="Hostfiles and farm state.")
+
+    p_run = sub.add_parser("run", parents=[common], help="Run the farm (inside the allocation, or locally).")
+    p_run.add_argument("--scheduler", choices=["local", *sorted(HOST_SOURCES)], default="local")
+    p_run.add_argument("--cores", type=int, default=None, help="Cores to use in local mode (default: all).")
+    p_run.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between checks on running jobs.")
+
+    p_script = sub.add_parser("script", parents=[common], help="Write a PBS/Slurm job script for the farm.")
+    p_script.add_argument("--scheduler", choices=["pbs", "slurm"], required=True)
+    p_script.add_argument("--nodes", type=int, required=True)
+    p_script.add_argument("--ppn", type=int, default=16, help="Slots (MPI processes) per node.")
+    p_script.add_argument("--walltime", type=str, default="24:00:00")
+    p_script.add_argument("--name", type=str, default="nufeb_farm")
+    p_script.add_argument("--module", action="append", default=[], help="Environment module to load (repeatable).")
+    p_script.add_argument("-o", "--output", type=Path, default=Path("farm.job"))
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        write_script(args)
+
+
+if __name__ == "__main__":
+    main()
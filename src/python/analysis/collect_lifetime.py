@@ -1,49 +1,51 @@
+"""Collect cross-feeder lifetimes from NUFEB logs into a CSV table.
+
+The lifetime of a run is the first thermo step at which all species
+columns (by default CROSS1 and CROSS2) are below the threshold. Runs whose
+log never reaches it (e.g. killed by walltime) can fall back to counting
+types in their ``dump*.vtu`` series with ``--dumps``.
+
+    python collect_lifetime.py --data-dir biofilm/crossfeeding/data/exp_data --jobs 8
+    python collect_lifetime.py --dumps "runs/{stem}/vtk_EPS_ch"
+"""
+
 from pathlib import Path
-import re
+import argparse
 import csv
-from typing import Optional
+import hashlib
+import json
+from functools import partial
+from typing import Dict, Optional, Sequence
+
+from eps_biofilm.io_nufeb import PARSER_VERSION, find_logs, read_thermo, vtu_series
+from eps_biofilm.manifest import Manifest, map_files
+from eps_biofilm.metrics import first_step_below, lifetime_from_dumps
+
+DATA_DIR = Path("biofilm/crossfeeding/data/exp_data")
+THRESHOLD = 50.0
+SPECIES_COLUMNS = ("v_ncross1", "v_ncross2")
+FIELDNAMES = ["filename", "label", "lifetime_step"]
+# Thermo count columns of inputscript_EPS.nufeb and the atom type they count.
+THERMO_TYPES = {"v_ncross1": 1, "v_ncross2": 2, "v_ncheater": 3, "v_ndead": 4, "v_neps": 5}
 
-DATA_DIR = Path("C:\\Users\\User\\Desktop\\分子研究\\中研院物理所實習\\biofilm\\crossfeeding\\data\\exp_data")
-OUT_CSV = Path("C:\\Users\\User\\Desktop\\分子研究\\中研院物理所實習\\biofilm\\crossfeeding\\data\\lifetimes.csv")
-THRESHOLD = 50.0        
+
+def lifetime_from_log(
+    log_path: Path,
+    columns: Sequence[str] = SPECIES_COLUMNS,
+    thresholds: Sequence[float] = (THRESHOLD,),
+) -> Optional[int]:
+    df = read_thermo(log_path, columns=["Step", *columns])
+    return first_step_below(df["Step"], [df[c] for c in columns], thresholds)
 
 def parse_log_first_below_both(log_path: Path, thr: float = 50.0) -> Optional[int]:
-    idx_step = idx_n1 = idx_n2 = None
-    header_found = False
-
-    with log_path.open("r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            # Find header line containing column names
-            if not header_found and ("Step" in line and "v_ncross1" in line and "v_ncross2" in line):
-                headers = line.strip().split()
-                try:
-                    idx_step = headers.index("Step")
-                    idx_n1 = headers.index("v_ncross1")
-                    idx_n2 = headers.index("v_ncross2")
-                except ValueError:
-                    continue
-                header_found = True
-                continue
-
-            if header_found:
-                parts = line.strip().split()
-                if len(parts) <= max(idx_step, idx_n1, idx_n2):
-                    continue
-
-                # The value at idx_step should be integer-like
-                if not re.fullmatch(r"-?\d+", parts[idx_step]):
-                    continue
-
-                try:
-                    step = int(parts[idx_step])
-                    n1 = float(parts[idx_n1])
-                    n2 = float(parts[idx_n2])
-                except ValueError:
-                    continue
-
-                if n1 < thr and n2 < thr:
-                    return step
-    return None
+    return lifetime_from_log(log_path, SPECIES_COLUMNS, (thr,))
+
+def series_key(directory: Path, dumps: Sequence[tuple[int, Path]]) -> str:
+    """Cache key of a dump series: its directory and the name, size and mtime of every dump."""
+
+    stats = [(p.name, p.stat().st_size, p.stat().st_mtime_ns) for _, p in dumps]
+    parts = [str(directory.resolve()), stats]
+    return hashlib.blake2b(json.dumps(parts).encode(), digest_size=20).hexdigest()
 
 def label_from_name(name: str) -> Optional[int]:
     lname = name.lower()
@@ -53,34 +55,122 @@ def label_from_name(name: str) -> Optional[int]:
         return 1
     return None
 
-def main():
-    data_dir: Path = DATA_DIR
-    out_csv: Path = OUT_CSV
-    rows = []
-
-    # Create data dir if missing
-    data_dir.mkdir(parents=True, exist_ok=True)
-
-    for log_path in sorted(data_dir.glob("*.log")):
-        label = label_from_name(log_path.name)
-        if label is None:
-            continue
-
-        lifetime = parse_log_first_below_both(log_path, thr=THRESHOLD)
-        rows.append({
-            "filename": log_path.name,
-            "label": label,
+def collect_lifetimes(
+    log_paths: Sequence[Path],
+    columns: Sequence[str] = SPECIES_COLUMNS,
+    thresholds: Sequence[float] = (THRESHOLD,),
+    jobs: int = 1,
+    manifest: Optional[Manifest] = None,
+    dump_template: Optional[str] = None,
+) -> list:
+    """Return one CSV row per log, in the order of `log_paths`.
+
+    With ``jobs > 1`` the logs are parsed in a process pool; results are
+    still returned in input order. With a `manifest`, unchanged logs and
+    byte-identical copies reuse the lifetime computed on an earlier run.
+    With `dump_template` (formatted with the log's ``stem``), runs whose
+    log gives no lifetime are looked up in their dump series instead,
+    in parallel too and cached on the directory and the size and mtime of
+    its dumps.
+    """
+
+    work = partial(lifetime_from_log, columns=tuple(columns), thresholds=tuple(thresholds))
+    kind = f"lifetime:v{PARSER_VERSION}:{','.join(columns)}:{','.join(map(repr, thresholds))}"
+    lifetimes = map_files(work, log_paths, jobs=jobs, manifest=manifest, kind=kind)
+    if dump_template is not None:
+        types = tuple(THERMO_TYPES[c] for c in columns)
+        series: Dict[int, tuple[Path, list]] = {}
+        for i, p in enumerate(log_paths):
+            dump_dir = Path(dump_template.format(stem=p.name.split(".")[0]))
+            dumps = vtu_series(dump_dir) if lifetimes[i] is None and dump_dir.is_dir() else []
+            if dumps:
+                series[i] = (dump_dir, dumps)
+        dump_dirs = [d for d, _ in series.values()]
+        keys = [series_key(d, dumps) for d, dumps in series.values()]
+        work = partial(lifetime_from_dumps, types=types, thresholds=tuple(thresholds))
+        kind = f"dump_lifetime:v{PARSER_VERSION}:{','.join(map(str, types))}:{','.join(map(repr, thresholds))}"
+        found = map_files(work, dump_dirs, jobs=jobs, manifest=manifest, kind=kind, keys=keys)
+        for i, lifetime in zip(series, found):
+            lifetimes[i] = lifetime
+    return [
+        {
+            "filename": p.name,
+            "label": label_from_name(p.name),
             "lifetime_step": "" if lifetime is None else lifetime
-        })
+        }
+        for p, lifetime in zip(log_paths, lifetimes)
+    ]
 
-    # Write CSV
+def write_lifetimes(rows: Sequence[dict], out_csv: Path) -> None:
     out_csv.parent.mkdir(parents=True, exist_ok=True)
     with out_csv.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["filename", "label", "lifetime_step"])
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
         writer.writerows(rows)
 
-    print(f"[OK] Scanned {len(list(DATA_DIR.glob('*.log')))} .log files; wrote {len(rows)} rows to {out_csv}")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory holding the .log files.")
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Output CSV (default: lifetimes.csv next to the data directory)."
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.log",
+        help="Glob for log files inside --data-dir (compressed .gz/.zst/.xz/.bz2 copies match too)."
+    )
+    parser.add_argument(
+        "--columns",
+        nargs="+",
+        default=list(SPECIES_COLUMNS),
+        help="Thermo columns that must all drop below the threshold."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        nargs="+",
+        default=[THRESHOLD],
+        help="One threshold for all columns, or one per column."
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument(
+        "--dumps",
+        default=None,
+        help="Dump directory of each run, with {stem} for the log name without suffixes; "
+             "used when the log gives no lifetime."
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="SQLite result cache (default: .manifest.sqlite inside --data-dir)."
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every log, ignoring the manifest.")
+    args = parser.parse_args()
+
+    if len(args.threshold) not in (1, len(args.columns)):
+        parser.error("--threshold takes one value or one value per --columns entry")
+    if args.dumps is not None and not set(args.columns) <= set(THERMO_TYPES):
+        parser.error(f"--dumps can only count the columns {', '.join(THERMO_TYPES)}")
+
+    data_dir: Path = args.data_dir
+    out_csv: Path = args.out or data_dir.parent / "lifetimes.csv"
+
+    all_logs = find_logs(data_dir, args.pattern)
+    log_paths = [p for p in all_logs if label_from_name(p.name) is not None]
+    if args.no_cache:
+        rows = collect_lifetimes(log_paths, args.columns, args.threshold, jobs=args.jobs, dump_template=args.dumps)
+    else:
+        with Manifest(args.manifest or data_dir / ".manifest.sqlite") as manifest:
+            rows = collect_lifetimes(
+                log_paths, args.columns, args.threshold, jobs=args.jobs, manifest=manifest, dump_template=args.dumps
+            )
+    write_lifetimes(rows, out_csv)
+
+    print(f"[OK] Scanned {len(all_logs)} .log files; wrote {len(rows)} rows to {out_csv}")
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 import pandas as pd
-import re
 import matplotlib.pyplot as plt
+
+from eps_biofilm.io_nufeb import read_thermo, read_thermo_steps
 plt.rcParams.update({
     "font.size": 16,        
     "axes.titlesize": 18,   
@@ -18,84 +19,25 @@ DO_WRITE_CSV = None
 STEP_MIN = None         
 STEP_MAX = None         
 
-def parse_log(filename):
-    records = []
-
-    in_table = False
-    idx = {}       
-    max_idx = -1   
-
+def parse_log(filename, step_min=None, step_max=None):
     required = ["Step", "v_ncross1", "v_ncross2"]
-    optional = ["CPU", "Atoms", "v_ncheater", "v_ndead", "v_mass"]
-
-    with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            s = line.strip()
-
-            if not in_table:
-                if s.startswith("Step"):
-                    headers = s.split()
-
-                    if all(k in headers for k in required):
-                        idx.clear()
-                        max_idx = -1
-                        for k in required + optional:
-                            if k in headers:
-                                idx[k] = headers.index(k)
-                                if idx[k] > max_idx:
-                                    max_idx = idx[k]
-                        in_table = True
-                continue
-
-            parts = line.split()
-
-            if len(parts) == 0:
-                in_table = False
-                continue
-
-            if len(parts) <= max_idx:
-                continue
-            if not parts[idx["Step"]].isdigit():
-                continue
-            try:
-                rec = {
-                    "Step": int(parts[idx["Step"]]),
-                    "v_ncross1": int(parts[idx["v_ncross1"]]),
-                    "v_ncross2": int(parts[idx["v_ncross2"]]),
-                }
-                if "CPU" in idx:
-                    rec["CPU"] = float(parts[idx["CPU"]])
-                if "Atoms" in idx:
-                    rec["Atoms"] = int(parts[idx["Atoms"]])
-                if "v_ncheater" in idx:
-                    rec["v_ncheater"] = int(parts[idx["v_ncheater"]])
-                if "v_ndead" in idx:
-                    rec["v_ndead"] = int(parts[idx["v_ndead"]])
-                if "v_mass" in idx:
-                    rec["v_mass"] = float(parts[idx["v_mass"]])
-
-                records.append(rec)
-            except ValueError:
-                continue
-
     preferred_order = ["Step", "CPU", "Atoms", "v_ncross1", "v_ncross2", "v_ncheater", "v_ndead", "v_mass"]
-    if records:
-        df = pd.DataFrame.from_records(records)
-        cols = [c for c in preferred_order if c in df.columns]
-        df = df[cols]
+
+    if step_min is None and step_max is None:
+        df = read_thermo(filename)
     else:
-        df = pd.DataFrame(columns=required)
+        # Only touch the rows in the window, via the log's step index.
+        df = read_thermo_steps(filename, step_min, step_max)
+    if df.empty or not all(k in df.columns for k in required):
+        return pd.DataFrame(columns=required)
 
-    return df
+    df = df.dropna(subset=required)
+    cols = [c for c in preferred_order if c in df.columns]
+    return df[cols].reset_index(drop=True)
 
 
 if __name__ == "__main__":
-    df = parse_log(LOG_PATH)
-
-    if STEP_MIN is not None:
-        df = df[df["Step"] >= STEP_MIN]
-    if STEP_MAX is not None:
-        df = df[df["Step"] <= STEP_MAX]
+    df = parse_log(LOG_PATH, STEP_MIN, STEP_MAX)
 
     if DO_WRITE_CSV:
         df.to_csv(OUTPUT_CSV, index=False)
@@ -0,0 +1,156 @@
+"""Adaptive seed replication for EPS-vs-NEPS lifetime comparisons.
+
+Instead of a fixed number of seeds per condition (parameter sample),
+seeds are added in batches. After every batch the difference of median
+lifetimes (EPS minus NEPS) of each condition gets a percentile bootstrap
+confidence interval; a condition stops receiving seeds once the interval
+excludes zero, is narrower than the requested precision, or the seed
+budget is spent. A condition that spent its budget without a usable
+lifetime in one of its arms (every run failed) is marked ``failed``.
+
+Every batch is a new look at the data, which inflates the chance of a
+spurious "difference found". `StoppingRule` therefore splits the error
+rate evenly over the largest possible number of looks (Bonferroni), so
+the overall level holds however early a condition stops.
+
+The lifetime of a run is its collapse step. Runs that never collapse
+are censored at their last step; the median is then a lower bound when
+more than half of a condition's runs survive to the end.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DECISIONS = ("eps_longer", "neps_longer", "resolved", "budget", "failed", "continue")
+
+
+@dataclass
+class StoppingRule:
+    initial: int = 10
+    batch: int = 5
+    max_replicates: int = 50
+    alpha: float = 0.05
+    precision: Optional[float] = None
+    n_boot: int = 2000
+
+    @classmethod
+    def from_config(cls, spec: Mapping[str, Any]) -> "StoppingRule":
+        """Rule from the ``adaptive`` section of a sweep config; missing keys keep their defaults."""
+
+        fields = {k: spec[k] for k in cls.__dataclass_fields__ if spec.get(k) is not None}
+        return cls(**fields)
+
+    @property
+    def looks(self) -> int:
+        """Largest number of batches (and so of tests) one condition can get."""
+
+        return 1 + math.ceil(max(0, self.max_replicates - self.initial) / self.batch)
+
+    @property
+    def level(self) -> float:
+        """Confidence level of the interval computed at each look."""
+
+        return 1.0 - self.alpha / self.looks
+
+
+def lifetime(summary: Mapping[str, Any]) -> Optional[float]:
+    """Collapse step of a `metrics.summarise_thermo` summary, or its last step if it never collapsed."""
+
+    step = summary["collapse_step"] if summary["collapse_step"] is not None else summary["last_step"]
+    return None if step is None else float(step)
+
+
+def bootstrap_median_diff(
+    a: Sequence[float],
+    b: Sequence[float],
+    level: float = 0.95,
+    n_boot: int = 2000,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[float, float, float]:
+    """``median(a) - median(b)`` and its percentile bootstrap interval at `level`."""
+
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    rng = rng or np.random.default_rng()
+    boot_a = np.median(a[rng.integers(0, len(a), (n_boot, len(a)))], axis=1)
+    boot_b = np.median(b[rng.integers(0, len(b), (n_boot, len(b)))], axis=1)
+    lo, hi = np.quantile(boot_a - boot_b, [(1 - level) / 2, (1 + level) / 2])
+    return float(np.median(a) - np.median(b)), float(lo), float(hi)
+
+
+def evaluate(
+    runs: pd.DataFrame, rule: StoppingRule, seed: Optional[int] = None, samples: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """Decide, per condition, whether more seeds are needed.
+
+    `runs` has one row per submitted run with columns ``sample``, ``arm``
+    (``"eps"`` or ``"neps"``), ``replicate`` and ``lifetime``, which is
+    NaN for runs that failed or gave no lifetime. Returns one row per
+    sample of `runs` and of `samples` with the number of runs submitted
+    (``n_runs``, the smaller arm) and of usable lifetimes per arm, the
+    median lifetimes, their difference with its interval (``diff_lo``,
+    ``diff_hi``) and a ``decision`` out of `DECISIONS`. Each sample is
+    resampled with its own generator seeded from `seed`, so a condition
+    whose runs did not change keeps its interval and its decision.
+    """
+
+    rows = []
+    for sample in sorted(set(runs["sample"]).union(samples or ())):
+        group = runs[runs["sample"] == sample]
+        arm_eps, arm_neps = group["arm"] == "eps", group["arm"] == "neps"
+        eps = group.loc[arm_eps, "lifetime"].dropna().to_numpy(dtype=float)
+        neps = group.loc[arm_neps, "lifetime"].dropna().to_numpy(dtype=float)
+        row: Dict[str, Any] = {
+            "sample": sample, "n_runs": min(arm_eps.sum(), arm_neps.sum()), "n_eps": len(eps), "n_neps": len(neps)
+        }
+        if len(eps) and len(neps):
+            rng = np.random.default_rng(None if seed is None else [seed, int(sample)])
+            diff, lo, hi = bootstrap_median_diff(eps, neps, rule.level, rule.n_boot, rng)
+            row.update(median_eps=np.median(eps), median_neps=np.median(neps), diff=diff, diff_lo=lo, diff_hi=hi)
+        rows.append(row)
+
+    columns = ["sample", "n_runs", "n_eps", "n_neps", "median_eps", "median_neps", "diff", "diff_lo", "diff_hi"]
+    table = pd.DataFrame.from_records(rows, columns=columns)
+    n = table[["n_eps", "n_neps"]].min(axis=1)
+    spent = (table["n_runs"] >= rule.max_replicates).to_numpy()
+    decision = np.full(len(table), "continue", dtype=object)
+    decision[spent] = "budget"
+    if rule.precision is not None:
+        decision[(table["diff_hi"] - table["diff_lo"] <= 2 * rule.precision).to_numpy()] = "resolved"
+    decision[(table["diff_hi"] < 0).to_numpy()] = "neps_longer"
+    decision[(table["diff_lo"] > 0).to_numpy()] = "eps_longer"
+    decision[(n < min(rule.initial, rule.max_replicates)).to_numpy() & ~spent] = "continue"
+    decision[spent & (n == 0).to_numpy()] = "failed"
+    table["decision"] = decision
+    return table
+
+
+def next_batch(
+    replicates: Mapping[int, int], decisions: Optional[pd.DataFrame], rule: StoppingRule
+) -> Dict[int, range]:
+    """Replicate indices to run next, per sample, in both arms.
+
+    `replicates` maps every sample to the number of replicates already
+    submitted (1-based indices, so replicate ``k`` has the seeds of
+    ``replicate_seeds(script, k)``). Samples without a decision yet get
+    up to ``rule.initial`` seeds; samples still at ``"continue"`` get
+    another ``rule.batch``, within ``rule.max_replicates``.
+    """
+
+    go = set() if decisions is None else set(decisions.loc[decisions["decision"] == "continue", "sample"])
+    batches = {}
+    for sample, done in replicates.items():
+        if done < min(rule.initial, rule.max_replicates):
+            target = min(rule.initial, rule.max_replicates)
+        elif sample in go:
+            target = min(done + rule.batch, rule.max_replicates)
+        else:
+            continue
+        if target > done:
+            batches[sample] = range(done + 1, target + 1)
+    return batches
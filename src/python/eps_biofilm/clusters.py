@@ -0,0 +1,162 @@
+"""Contact-graph clusters and their lineage across dump frames.
+
+A cluster is a connected component of the touching-sphere graph of a
+frame (`spatial.contact_pairs`). Atom ids persist across dumps, so
+clusters in consecutive frames are linked by the ids they share; a
+track follows one cluster through growth, splits and merges.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .particles import TYPE_NAMES, ParticleFrame
+from .spatial import contact_pairs
+
+
+def union_find(n: int, pairs: np.ndarray) -> np.ndarray:
+    """Connected-component labels of `n` nodes joined by `pairs`, without Python loops over nodes.
+
+    Vectorized hook-and-compress: every round hooks the larger root of
+    each unsatisfied pair onto the smaller one, then flattens the forest
+    by pointer jumping. The label of a component is its smallest node.
+    """
+
+    parent = np.arange(n)
+    i, j = pairs[:, 0], pairs[:, 1]
+    while True:
+        ri, rj = parent[i], parent[j]
+        open_ = ri != rj
+        if not open_.any():
+            return parent
+        lo, hi = np.minimum(ri[open_], rj[open_]), np.maximum(ri[open_], rj[open_])
+        np.minimum.at(parent, hi, lo)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        i, j = i[open_], j[open_]
+
+
+def label_clusters(
+    frame: ParticleFrame,
+    tol: float = 0.0,
+    box: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """Cluster label (``0 .. k-1``, largest cluster first) of every particle."""
+
+    n = len(frame)
+    roots = union_find(n, contact_pairs(frame, tol, box))
+    _, inverse, sizes = np.unique(roots, return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.intp)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    return rank[inverse]
+
+
+def cluster_table(frame: ParticleFrame, labels: np.ndarray) -> pd.DataFrame:
+    """Size, per-type composition and volume of each cluster."""
+
+    k = int(labels.max()) + 1 if len(labels) else 0
+    table = pd.DataFrame({
+        "cluster": np.arange(k),
+        "size": np.bincount(labels, minlength=k),
+        "volume": np.bincount(labels, weights=frame.volume(), minlength=k),
+    })
+    for t, name in TYPE_NAMES.items():
+        table[f"n_{name}"] = np.bincount(labels[frame.indices(t)], minlength=k)
+    return table
+
+
+def link_clusters(
+    prev_ids: np.ndarray,
+    prev_labels: np.ndarray,
+    ids: np.ndarray,
+    labels: np.ndarray,
+) -> pd.DataFrame:
+    """Overlap between the clusters of two frames: ``prev, cluster, shared`` rows.
+
+    ``shared`` counts atom ids present in both clusters.
+    """
+
+    _, a, b = np.intersect1d(prev_ids, ids, assume_unique=True, return_indices=True)
+    if len(a) == 0:
+        return pd.DataFrame({"prev": [], "cluster": [], "shared": []}, dtype=np.int64)
+    width = int(labels.max()) + 1
+    key = prev_labels[a].astype(np.int64) * width + labels[b]
+    uniq, shared = np.unique(key, return_counts=True)
+    return pd.DataFrame({"prev": uniq // width, "cluster": uniq % width, "shared": shared})
+
+
+def track_clusters(
+    frames: Iterable[Tuple[int, ParticleFrame]],
+    tol: float = 0.0,
+    box: Optional[Sequence[float]] = None,
+    min_size: int = 1,
+) -> pd.DataFrame:
+    """Follow clusters through a ``(step, frame)`` series.
+
+    Each cluster inherits the track of the previous-frame cluster it
+    shares most ids with. When several clusters claim the same track
+    (a split), the one sharing most ids keeps it and the others start
+    new tracks with ``parent_track`` set; a cluster with no shared ids
+    starts a new track without a parent. Clusters below `min_size`
+    particles are dropped from the output but still used for linking.
+
+    Returns one row per (step, cluster) with the `cluster_table` columns
+    plus ``track`` and ``parent_track`` (-1 when none).
+    """
+
+    out = []
+    prev: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+    next_track = 0
+    for step, frame in frames:
+        ids = frame.id
+        labels = label_clusters(frame, tol, box)
+        table = cluster_table(frame, labels)
+        k = len(table)
+        track = np.full(k, -1, dtype=np.int64)
+        parent = np.full(k, -1, dtype=np.int64)
+
+        if prev is not None and k:
+            prev_ids, prev_labels, prev_track = prev
+            links = link_clusters(prev_ids, prev_labels, ids, labels)
+            # Best previous cluster of each cluster ...
+            best = links.sort_values(["cluster", "shared"], ascending=[True, False]).drop_duplicates("cluster")
+            claim = best.assign(track=prev_track[best["prev"].to_numpy()])
+            # ... and, per claimed track, the cluster that keeps it.
+            keeper = claim.sort_values("shared", ascending=False, kind="stable").drop_duplicates("track")
+            track[keeper["cluster"].to_numpy()] = keeper["track"].to_numpy()
+            split = claim[~claim["cluster"].isin(keeper["cluster"])]
+            parent[split["cluster"].to_numpy()] = split["track"].to_numpy()
+
+        new = track < 0
+        track[new] = np.arange(next_track, next_track + new.sum())
+        next_track += int(new.sum())
+
+        table.insert(0, "step", step)
+        table["track"] = track
+        table["parent_track"] = parent
+        out.append(table[table["size"] >= min_size])
+        prev = (ids, labels, track)
+
+    if not out:
+        return pd.DataFrame()
+    return pd.concat(out, ignore_index=True)
+
+
+def track_lifetimes(tracks: pd.DataFrame) -> pd.DataFrame:
+    """Per-track birth/last step, number of frames, peak size and parent."""
+
+    g = tracks.groupby("track")
+    return pd.DataFrame({
+        "first_step": g["step"].min(),
+        "last_step": g["step"].max(),
+        "n_frames": g["step"].size(),
+        "max_size": g["size"].max(),
+        "parent_track": g["parent_track"].first(),
+    }).reset_index()
+
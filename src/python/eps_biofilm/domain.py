@@ -0,0 +1,195 @@
+"""Shared-memory, slab-decomposed analysis of very large particle frames.
+
+The frame is copied once into a `multiprocessing.shared_memory` block.
+The periodic xy domain is cut into a ``px x py`` grid of slabs spanning
+the full height, like ``processors * * 1`` in LAMMPS. Each worker maps
+the shared block, gathers the particles of its slab plus periodic ghost
+images within `margin` of its edges, and evaluates a per-slab function.
+The per-slab results are then summed.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .particles import COLUMNS, ParticleFrame
+from .spatial import finish_metrics, metric_sums
+
+SlabFunc = Callable[[ParticleFrame, np.ndarray, np.ndarray], Dict[str, float]]
+
+
+class SharedFrame:
+    """A `ParticleFrame` copied into one shared-memory block.
+
+    ``spec`` is a small picklable description that workers pass to
+    `attach_frame` to get zero-copy views of the columns. Use as a
+    context manager so the block is unlinked afterwards.
+    """
+
+    def __init__(self, frame: ParticleFrame) -> None:
+        columns = [(name, np.asarray(frame[name])) for name in COLUMNS]
+        layout = []
+        offset = 0
+        for name, arr in columns:
+            offset = -(-offset // 8) * 8
+            layout.append((name, arr.dtype.str, offset))
+            offset += arr.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, arr), (_, _, start) in zip(columns, layout):
+            np.ndarray(arr.shape, arr.dtype, buffer=self.shm.buf, offset=start)[...] = arr
+        self.spec = {"name": self.shm.name, "n": len(frame), "layout": layout}
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def attach_frame(spec: Dict[str, Any]) -> Tuple[ParticleFrame, shared_memory.SharedMemory]:
+    """Map a `SharedFrame` in a worker; keep the returned handle open while the frame is used."""
+
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    cols = {
+        name: np.ndarray((spec["n"],), np.dtype(dtype), buffer=shm.buf, offset=offset)
+        for name, dtype, offset in spec["layout"]
+    }
+    return ParticleFrame.from_arrays(cols, float32=cols["x"].dtype == np.float32), shm
+
+
+def slab_bounds(box: Sequence[float], grid: Tuple[int, int]) -> List[Tuple[float, float, float, float]]:
+    """``(x0, x1, y0, y1)`` of every slab of a ``px x py`` decomposition of the xy box."""
+
+    xs = np.linspace(0.0, box[0], grid[0] + 1)
+    ys = np.linspace(0.0, box[1], grid[1] + 1)
+    return [(xs[i], xs[i + 1], ys[j], ys[j + 1]) for i in range(grid[0]) for j in range(grid[1])]
+
+
+def _images(coord: np.ndarray, lo: float, hi: float, margin: float, period: float) -> List[Tuple[np.ndarray, float]]:
+    """Indices and shifts of the periodic images of `coord` that fall in ``[lo - margin, hi + margin)``."""
+
+    out = []
+    wrapped = np.mod(coord, period)
+    for shift in (-period, 0.0, period):
+        c = wrapped + shift
+        idx = np.flatnonzero((c >= lo - margin) & (c < hi + margin))
+        if len(idx):
+            out.append((idx, shift))
+    return out
+
+
+def gather_slab(
+    frame: ParticleFrame,
+    bounds: Tuple[float, float, float, float],
+    box: Sequence[float],
+    margin: float,
+) -> Tuple[ParticleFrame, np.ndarray, np.ndarray]:
+    """Local frame of one slab: owned particles plus ghost images, unwrapped in xy.
+
+    Returns the local frame, the owned mask and the global index of each
+    local particle. Local coordinates are shifted so that no periodic
+    wrapping is needed inside the slab.
+    """
+
+    x0, x1, y0, y1 = bounds
+    pieces = []
+    for xi, xs in _images(frame.x, x0, x1, margin, box[0]):
+        for yj, ys in _images(frame.y[xi], y0, y1, margin, box[1]):
+            pieces.append((xi[yj], xs, ys))
+
+    gid = np.concatenate([p[0] for p in pieces]) if pieces else np.empty(0, dtype=np.intp)
+    sx = np.concatenate([np.full(len(p[0]), p[1]) for p in pieces]) if pieces else np.empty(0)
+    sy = np.concatenate([np.full(len(p[0]), p[2]) for p in pieces]) if pieces else np.empty(0)
+    x = np.mod(frame.x[gid], box[0]) + sx
+    y = np.mod(frame.y[gid], box[1]) + sy
+    owned = (sx == 0) & (sy == 0) & (x >= x0) & (x < x1) & (y >= y0) & (y < y1)
+
+    local = ParticleFrame(
+        frame.id[gid], frame.type[gid], frame.diameter[gid], x, y, frame.z[gid], float32=frame.float32
+    )
+    return local, owned, gid
+
+
+def _run_slab(
+    bounds: Tuple[float, float, float, float],
+    spec: Dict[str, Any],
+    box: Tuple[float, float],
+    margin: float,
+    func: SlabFunc,
+) -> Dict[str, float]:
+    frame, shm = attach_frame(spec)
+    try:
+        local, owned, gid = gather_slab(frame, bounds, box, margin)
+        del frame
+        return func(local, owned, gid)
+    finally:
+        shm.close()
+
+
+def run_slabs(
+    frame: ParticleFrame,
+    func: SlabFunc,
+    box: Sequence[float],
+    grid: Tuple[int, int],
+    margin: float,
+    jobs: int = 1,
+) -> Dict[str, float]:
+    """Evaluate ``func(local_frame, owned, gid)`` on every slab and sum the results.
+
+    `func` must return additive quantities (counts, sums) keyed by name
+    and only count what belongs to `owned` particles; `margin` must be at
+    least the longest interaction range it looks at. `func` has to be
+    picklable (a module-level function or a `functools.partial` of one).
+    """
+
+    box = (float(box[0]), float(box[1]))
+    slabs = slab_bounds(box, grid)
+    with SharedFrame(frame) as shared:
+        task = partial(_run_slab, spec=shared.spec, box=box, margin=margin, func=func)
+        if jobs <= 1:
+            parts = [task(b) for b in slabs]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                parts = list(pool.map(task, slabs))
+
+    total: Dict[str, float] = {}
+    for part in parts:
+        for key, value in part.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def _slab_metric_sums(
+    local: ParticleFrame, owned: np.ndarray, gid: np.ndarray, tol: float, seg_radius: float
+) -> Dict[str, float]:
+    return metric_sums(local, tol, seg_radius, None, owned, gid)
+
+
+def slab_frame_metrics(
+    frame: ParticleFrame,
+    box: Sequence[float],
+    grid: Optional[Tuple[int, int]] = None,
+    tol: float = 0.0,
+    seg_radius: float = 5e-6,
+    jobs: int = 1,
+) -> Dict[str, float]:
+    """`spatial.frame_metrics` of a periodic frame, computed slab by slab in `jobs` processes.
+
+    `grid` defaults to ``jobs x 1`` slabs. The ghost margin is the
+    contact cutoff or `seg_radius`, whichever is larger, so the result
+    equals the single-process ``frame_metrics(frame, tol, seg_radius, box)``.
+    """
+
+    grid = grid or (max(jobs, 1), 1)
+    margin = max(float(frame.diameter.max()) + tol if len(frame) else 0.0, seg_radius)
+    func = partial(_slab_metric_sums, tol=tol, seg_radius=seg_radius)
+    return finish_metrics(run_slabs(frame, func, box, grid, margin, jobs))
@@ -0,0 +1,142 @@
+"""Overlap-free initial particle configurations for ``read_data`` files.
+
+Positions and diameters are drawn for all missing particles at once;
+candidates that overlap an accepted particle, or an earlier candidate of
+the same round, are rejected using a cell-list spatial hash, and the
+rejected ones are redrawn in the next round.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .particles import ParticleFrame
+
+
+class CellList:
+    """Spatial hash of points on the substratum into square xy cells of side `cell`.
+
+    Every inoculum particle touches the substratum, so hashing on x and y
+    alone loses nothing; the overlap test itself is still done in 3D.
+    Points are kept sorted by cell, with a dense table of where each cell
+    starts, so looking up a cell is a plain index. `add` merges new points
+    in without re-sorting the ones already hashed.
+    """
+
+    def __init__(self, pos: np.ndarray, cell: float, shape: Tuple[int, int]) -> None:
+        self.cell = cell
+        self.shape = shape
+        self.pos = np.empty((0, 3))
+        self.order = np.empty(0, dtype=np.intp)
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.counts = np.zeros(shape[0] * shape[1], dtype=np.int64)
+        self.add(pos)
+
+    def __len__(self) -> int:
+        return len(self.pos)
+
+    def coords(self, pos: np.ndarray) -> np.ndarray:
+        return np.clip((pos[:, :2] // self.cell).astype(np.int64), 0, np.array(self.shape) - 1)
+
+    def add(self, pos: np.ndarray) -> None:
+        c = self.coords(pos)
+        keys = c[:, 0] * self.shape[1] + c[:, 1]
+        new = np.argsort(keys, kind="stable")
+        at = np.searchsorted(self.sorted_keys, keys[new], side="right")
+        self.sorted_keys = np.insert(self.sorted_keys, at, keys[new])
+        self.order = np.insert(self.order, at, new + len(self.pos))
+        self.pos = np.concatenate([self.pos, pos])
+        self.counts += np.bincount(keys, minlength=len(self.counts))
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)])
+
+    def candidates(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(q, p)`` index pairs of query points and hashed points in the same or adjacent cells."""
+
+        c = self.coords(query)
+        qs, ps = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = c[:, 0] + dx, c[:, 1] + dy
+                q = np.flatnonzero((nx >= 0) & (nx < self.shape[0]) & (ny >= 0) & (ny < self.shape[1]))
+                key = nx[q] * self.shape[1] + ny[q]
+                start = self.starts[key]
+                n = self.starts[key + 1] - start
+                if not n.any():
+                    continue
+                # Expand every [start, start + n) range without a Python loop.
+                within = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+                qs.append(np.repeat(q, n))
+                ps.append(self.order[np.repeat(start, n) + within])
+        if not qs:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(qs), np.concatenate(ps)
+
+
+def _overlapping(
+    pos_a: np.ndarray, d_a: np.ndarray, pos_b: np.ndarray, d_b: np.ndarray, q: np.ndarray, p: np.ndarray
+) -> np.ndarray:
+    gap = np.linalg.norm(pos_a[q] - pos_b[p], axis=1)
+    return gap < 0.5 * (d_a[q] + d_b[p])
+
+
+def generate_config(
+    counts: Sequence[int],
+    dmins: Sequence[float],
+    dmaxs: Sequence[float],
+    densities: Sequence[float],
+    box: Sequence[float],
+    seed: Optional[int] = None,
+    max_rounds: int = 100,
+) -> ParticleFrame:
+    """Place ``counts[t-1]`` non-overlapping particles of each type ``t`` on the substratum.
+
+    Diameters are uniform in ``[dmins[t-1], dmaxs[t-1]]``. As in the
+    existing ``atom_ch.in`` files, each particle sits at ``z = d`` and
+    ``x, y`` are uniform in ``[d, L - d]``. The result is reproducible
+    for a given `seed`. Raises RuntimeError if the inoculum is too dense
+    to place within `max_rounds` rounds of redrawing.
+    """
+
+    rng = np.random.default_rng(seed)
+    counts = np.asarray(counts, dtype=np.int64)
+    dmins = np.asarray(dmins, dtype=np.float64)
+    dmaxs = np.asarray(dmaxs, dtype=np.float64)
+    box = np.asarray(box, dtype=np.float64)
+
+    cell = float(dmaxs.max())
+    shape = (max(int(np.ceil(box[0] / cell)), 1), max(int(np.ceil(box[1] / cell)), 1))
+
+    placed = CellList(np.empty((0, 3)), cell, shape)
+    diam = np.empty(0)
+    types = np.empty(0, dtype=np.int64)
+    for _ in range(max_rounds):
+        missing = counts - np.bincount(types - 1, minlength=len(counts)) if len(types) else counts.copy()
+        if not missing.any():
+            break
+        t = np.repeat(np.arange(1, len(counts) + 1), missing)
+        d = rng.uniform(dmins[t - 1], dmaxs[t - 1])
+        cand = np.column_stack([rng.uniform(d, box[0] - d), rng.uniform(d, box[1] - d), d])
+
+        keep = np.ones(len(t), dtype=bool)
+        if len(placed):
+            q, p = placed.candidates(cand)
+            keep[q[_overlapping(cand, d, placed.pos, diam, q, p)]] = False
+        q, p = CellList(cand, cell, shape).candidates(cand)
+        clash = (q < p) & _overlapping(cand, d, cand, d, q, p)
+        keep[p[clash]] = False
+
+        placed.add(cand[keep])
+        diam = np.concatenate([diam, d[keep]])
+        types = np.concatenate([types, t[keep]])
+    else:
+        missing = counts - np.bincount(types - 1, minlength=len(counts))
+        if missing.any():
+            raise RuntimeError(f"could not place {int(missing.sum())} particles in {max_rounds} rounds; box too dense")
+
+    order = np.argsort(types, kind="stable")
+    pos, diam, types = placed.pos[order], diam[order], types[order]
+    n = len(types)
+    extra = {"density": np.asarray(densities, dtype=np.float64)[types - 1], "outer_diameter": diam}
+    return ParticleFrame(np.arange(1, n + 1), types, diam, pos[:, 0], pos[:, 1], pos[:, 2], extra)
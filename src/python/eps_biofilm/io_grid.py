@@ -0,0 +1,243 @@
+"""Lazy xarray access to NUFEB grid dumps (``dump ... grid/vtk ... dump_%_*.vti``).
+
+Each dump step writes one ``.vti`` (VTK ImageData) file per grid field,
+``%`` being replaced by the field name (``con``, ``rea``, ``den``,
+``gro``); inside, there is one scalar array per substrate. The reader
+stacks them into a ``time x substrate x z x y x x`` Dataset with one
+variable per field. Frames are only read when indexed, and uncompressed
+raw-appended files are memory-mapped instead of read.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import xarray as xr
+from xarray.backends import BackendArray
+from xarray.core import indexing
+
+from .io_nufeb import (
+    _VTK_DTYPES,
+    _read_vtk_arrays,
+    _vtk_dtypes,
+    _vtk_header,
+    _xml_attrs,
+    detect_compression,
+    find_logs,
+)
+
+SUBSTRATES = ("sub", "metab1", "metab2")
+GRID_FIELDS = ("con", "rea", "den", "gro")
+
+_VTI_NAME = re.compile(r"^(?P<prefix>.*?)_?(?P<step>\d+)\.vti")
+_HEAD_CHUNK = 1 << 16
+
+
+def vti_series(directory: Path, pattern: str = "*.vti") -> Dict[str, List[tuple[int, Path]]]:
+    """Group grid dumps by field tag: ``{"con": [(step, path), ...], ...}``.
+
+    The tag is what ``%`` expanded to, i.e. the part between ``dump_``
+    and the step number; files without one are grouped under ``""``.
+    """
+
+    series: Dict[str, List[tuple[int, Path]]] = {}
+    for p in find_logs(directory, pattern):
+        m = _VTI_NAME.match(p.name)
+        if m is None:
+            continue
+        tag = m.group("prefix").split("_", 1)[1] if "_" in m.group("prefix") else ""
+        series.setdefault(tag, []).append((int(m.group("step")), p))
+    return {tag: sorted(files) for tag, files in series.items()}
+
+
+def _split_name(tag: str, name: str) -> tuple[str, str]:
+    """``(field, substrate)`` for array `name` found in a file tagged `tag`."""
+
+    parts = [p for p in re.split(r"[_\s]+", name) if p]
+    if tag:
+        rest = [p for p in parts if p != tag]
+        return tag, "_".join(rest) or name
+    for i, p in enumerate(parts):
+        if p in GRID_FIELDS:
+            return p, "_".join(parts[:i] + parts[i + 1:])
+    return name, ""
+
+
+def _read_head(path: Path) -> tuple[bytes, int]:
+    """XML head of an uncompressed VTK file and the file offset of its appended data (-1 if none)."""
+
+    head = b""
+    with Path(path).open("rb") as f:
+        while True:
+            chunk = f.read(_HEAD_CHUNK)
+            head += chunk
+            app = head.find(b"<AppendedData")
+            if app != -1:
+                tag_end = head.find(b">", app)
+                mark = head.find(b"_", tag_end) if tag_end != -1 else -1
+                if mark != -1:
+                    return head[:app], mark + 1
+            if not chunk:
+                return head, -1
+
+
+def _grid_shape(head: bytes, section: str) -> tuple[tuple[int, int, int], np.ndarray, np.ndarray]:
+    """``(nz, ny, nx)``, origin and spacing (x, y, z) of the ImageData in `head`."""
+
+    tag = head.find(b"<ImageData")
+    attrs = _xml_attrs(head[tag:head.find(b">", tag)])
+    ext = np.array(attrs["WholeExtent"].split(), dtype=int)
+    dims = ext[1::2] - ext[0::2] + (section == "PointData")
+    origin = np.array(attrs.get("Origin", "0 0 0").split(), dtype=float)
+    spacing = np.array(attrs.get("Spacing", "1 1 1").split(), dtype=float)
+    return (int(dims[2]), int(dims[1]), int(dims[0])), origin, spacing
+
+
+def read_vti(path: Path) -> tuple[Dict[str, np.ndarray], Dict[str, object]]:
+    """Read one grid dump: ``({array name: (nz, ny, nx) array}, meta)``.
+
+    Uncompressed files with raw appended data are memory-mapped and the
+    arrays are read-only views on the mapping; anything else (ascii,
+    base64, zlib, gzip/zstd files) is decoded in memory. `meta` holds
+    ``origin``, ``spacing``, ``section`` (PointData or CellData) and
+    ``shape``.
+    """
+
+    arrays: List[tuple[str, Dict[str, str], np.ndarray]] = []
+    head = b""
+    if detect_compression(path) is None:
+        head, data_start = _read_head(path)
+        root, layout = _vtk_header(head)
+        layout = [a for a in layout if a[0] in ("PointData", "CellData")]
+        if data_start != -1 and "compressor" not in root and all(a.get("format") == "appended" for _, a, _ in layout):
+            order, header = _vtk_dtypes(root)
+            mm = np.memmap(path, dtype=np.uint8, mode="r")
+            for section, attrs, _ in layout:
+                dtype = np.dtype(order + _VTK_DTYPES[attrs["type"]])
+                offset = data_start + int(attrs["offset"])
+                nbytes = int(np.frombuffer(mm, header, 1, offset)[0])
+                arrays.append((section, attrs, np.frombuffer(mm, dtype, nbytes // dtype.itemsize, offset + header.itemsize)))
+    if not arrays:
+        head, arrays = _read_vtk_arrays(path, ("PointData", "CellData"))
+
+    section = arrays[0][0] if arrays else "CellData"
+    shape, origin, spacing = _grid_shape(head, section)
+    frame = {
+        attrs.get("Name", f"array{i}"): values.reshape(shape)
+        for i, (_, attrs, values) in enumerate(arrays)
+        if int(attrs.get("NumberOfComponents", 1)) == 1
+    }
+    return frame, {"origin": origin, "spacing": spacing, "section": section, "shape": shape}
+
+
+class _GridStack(BackendArray):
+    """One grid field over all steps, as a lazily indexed ``(time, substrate, z, y, x)`` array."""
+
+    def __init__(
+        self,
+        files: Sequence[Optional[Path]],
+        tag: str,
+        field: str,
+        substrates: Sequence[str],
+        shape: tuple[int, int, int],
+        dtype: np.dtype,
+    ) -> None:
+        self.files = list(files)
+        self.tag = tag
+        self.field = field
+        self.substrates = list(substrates)
+        self.shape = (len(self.files), len(self.substrates)) + tuple(shape)
+        self.dtype = dtype
+
+    def __getitem__(self, key: indexing.ExplicitIndexer) -> np.ndarray:
+        return indexing.explicit_indexing_adapter(key, self.shape, indexing.IndexingSupport.BASIC, self._getitem)
+
+    def _getitem(self, key: tuple) -> np.ndarray:
+        t_key, s_key, space = key[0], key[1], tuple(key[2:])
+        times = np.atleast_1d(np.arange(self.shape[0])[t_key])
+        subs = np.atleast_1d(np.arange(self.shape[1])[s_key])
+        grid = np.broadcast_to(np.zeros((), dtype=np.int8), self.shape[2:])[space].shape
+
+        out = np.full((times.size, subs.size) + grid, np.nan, dtype=self.dtype)
+        for i, t in enumerate(times):
+            if self.files[t] is None:
+                continue
+            frame, _ = read_vti(self.files[t])
+            by_substrate = {}
+            for name, values in frame.items():
+                field, substrate = _split_name(self.tag, name)
+                if field == self.field:
+                    by_substrate[substrate] = values
+            for j, s in enumerate(subs):
+                values = by_substrate.get(self.substrates[s])
+                if values is not None:
+                    out[i, j] = values[space]
+
+        return out[(0 if isinstance(t_key, (int, np.integer)) else slice(None),
+                    0 if isinstance(s_key, (int, np.integer)) else slice(None))]
+
+
+def open_grid_dataset(
+    directory: Path,
+    pattern: str = "*.vti",
+    fields: Optional[Sequence[str]] = None,
+    chunk_frames: Optional[int] = 1,
+) -> xr.Dataset:
+    """Open a run's grid dumps as one lazy ``time x substrate x z x y x x`` Dataset.
+
+    Only the first file of each field is read up front (for names, shape
+    and spacing); frames are read on access. With `chunk_frames` the
+    Dataset is dask-backed with that many steps per chunk, so reductions
+    over a whole run stream frame by frame; ``chunk_frames=None`` keeps
+    xarray's own lazy indexing and needs no dask. Steps missing a field,
+    or substrates absent from a field, read as NaN.
+    """
+
+    series = vti_series(directory, pattern)
+    if not series:
+        raise FileNotFoundError(f"no grid dumps matching {pattern!r} in {directory}")
+
+    steps = sorted({step for files in series.values() for step, _ in files})
+    layouts = {}
+    meta = None
+    for tag, files in series.items():
+        frame, frame_meta = read_vti(files[0][1])
+        meta = meta or frame_meta
+        names: Dict[str, List[str]] = {}
+        for name in frame:
+            field, substrate = _split_name(tag, name)
+            names.setdefault(field, []).append(substrate)
+        dtype = np.result_type(*(v.dtype for v in frame.values()), np.float32) if frame else np.dtype(float)
+        by_step = dict(files)
+        layouts[tag] = (names, dtype, [by_step.get(s) for s in steps])
+
+    found = [s for names, _, _ in layouts.values() for subs in names.values() for s in subs]
+    substrates = [s for s in SUBSTRATES if s in found] + [s for s in dict.fromkeys(found) if s not in SUBSTRATES]
+
+    nz, ny, nx = meta["shape"]
+    offset = 0.5 if meta["section"] == "CellData" else 0.0
+    ox, oy, oz = meta["origin"]
+    dx, dy, dz = meta["spacing"]
+    coords = {
+        "time": ("time", np.asarray(steps, dtype=np.int64)),
+        "substrate": ("substrate", substrates),
+        "z": ("z", oz + (np.arange(nz) + offset) * dz),
+        "y": ("y", oy + (np.arange(ny) + offset) * dy),
+        "x": ("x", ox + (np.arange(nx) + offset) * dx),
+    }
+
+    data_vars = {}
+    for tag, (names, dtype, files) in layouts.items():
+        for field in names:
+            if fields is not None and field not in fields:
+                continue
+            stack = _GridStack(files, tag, field, substrates, (nz, ny, nx), dtype)
+            data_vars[field] = xr.Variable(("time", "substrate", "z", "y", "x"), indexing.LazilyIndexedArray(stack))
+
+    ds = xr.Dataset(data_vars, coords=coords, attrs={"origin": meta["origin"], "spacing": meta["spacing"]})
+    if chunk_frames is not None:
+        ds = ds.chunk({"time": chunk_frames})
+    return ds
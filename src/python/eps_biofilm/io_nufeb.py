@@ -1,27 +1,986 @@
-"""I/O helpers for NUFEB/LAMMPS outputs.
+"""Readers and writers for NUFEB/LAMMPS outputs.
 
-This file intentionally stays very light: adapt it to
-your actual output file formats (dumps, logs, etc.).
+Every reader accepts gzip/zstd/xz/bz2 copies as well (`open_nufeb`).
+
+- Logs: `read_thermo` parses every thermo table of a log in bulk;
+  `build_thermo_index`/`read_thermo_steps` seek straight to the last
+  steps; `follow_thermo` tails a log while the run is going;
+  `read_timing` reads the ``Loop time`` summaries and MPI timing tables.
+- Archive: `write_thermo_archive`/`load_thermo_archive` keep thermo
+  tables in a partitioned Parquet dataset.
+- Particles: `read_vtu` decodes ``.vtu`` dumps without VTK into a
+  `ParticleFrame` (`vtu_series`, `iter_vtu_frames`, `vtu_type_counts`);
+  `read_data_file`/`write_data_file` handle LAMMPS data files.
+
+`PARSER_VERSION` is part of every cached result built on these readers.
 """
 
 from __future__ import annotations
 
+import base64
+import bz2
+import gzip
+import io
+import json
+import lzma
+import mmap
+import os
+import re
+import shutil
+import subprocess
+import time
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
+from typing import IO, Callable, Dict, Any, Iterator, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
+from .particles import ParticleFrame
+
+
+# Magic bytes of the compression formats we can stream.
+_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"\xfd7zXZ\x00": "xz",
+    b"BZh": "bz2",
+}
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".xz", ".bz2")
+
+# Part of every manifest result kind built on these readers. Bump it
+# whenever a reader's output changes, so cached results are recomputed.
+PARSER_VERSION = 2
+
+# External decompressors, preferred when on PATH: they run in their own
+# process (pigz/xz/lbzip2 also multi-threaded), in parallel with parsing.
+_PIPE_COMMANDS = {
+    "gzip": [("pigz", "-dc", "-p", "{threads}")],
+    "zstd": [("zstd", "-dc", "-q")],
+    "xz": [("xz", "-dc", "-T", "{threads}")],
+    "bz2": [("lbzip2", "-dc", "-n", "{threads}"), ("pbzip2", "-dc", "-p{threads}")],
+}
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """Return ``"gzip"``, ``"zstd"``, ``"xz"``, ``"bz2"`` or None, from the file's magic bytes."""
+
+    with Path(path).open("rb") as f:
+        head = f.read(6)
+    for magic, name in _MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+class _PipeReader(io.RawIOBase):
+    """Raw stream over the stdout of an external decompressor."""
+
+    def __init__(self, cmd: List[str]) -> None:
+        self._cmd = cmd
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        n = self._proc.stdout.readinto(b)
+        if not n:
+            self._eof = True
+        return n
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if not self._eof:
+            self._proc.kill()  # closed early: the rest of the stream is not wanted
+        self._proc.stdout.close()
+        stderr = self._proc.stderr.read()
+        self._proc.stderr.close()
+        returncode = self._proc.wait()
+        super().close()
+        if self._eof and returncode != 0:
+            raise OSError(f"{self._cmd[0]} failed ({returncode}): {stderr.decode(errors='ignore').strip()}")
+
+
+def open_nufeb(path: Path, mode: str = "rb", threads: int | None = None) -> IO:
+    """Open a (possibly compressed) NUFEB output for streaming reads.
+
+    gzip, zstd, xz and bz2 are detected from the magic bytes, not the file
+    name. An external decompressor (pigz, zstd, xz -T, lbzip2) is used when
+    available, otherwise the stdlib modules (or the ``zstandard`` package
+    for zstd). Compressed streams are forward-only. `mode` is ``"rb"`` or
+    ``"rt"``; text mode decodes UTF-8 and ignores bad bytes, like the old
+    per-script readers.
+    """
+
+    if mode not in ("rb", "rt"):
+        raise ValueError(f"unsupported mode {mode!r}")
+    path = Path(path)
+    kind = detect_compression(path)
+    threads = threads or os.cpu_count() or 1
+
+    if kind is None:
+        stream: IO = path.open("rb")
+    else:
+        stream = None
+        for cmd in _PIPE_COMMANDS[kind]:
+            if shutil.which(cmd[0]):
+                args = [c.format(threads=threads) for c in cmd] + [str(path)]
+                stream = io.BufferedReader(_PipeReader(args), buffer_size=1 << 20)
+                break
+        if stream is None:
+            if kind == "gzip":
+                stream = gzip.open(path, "rb")
+            elif kind == "xz":
+                stream = lzma.open(path, "rb")
+            elif kind == "bz2":
+                stream = bz2.open(path, "rb")
+            else:
+                import zstandard  # optional dependency, only needed without the zstd CLI
+
+                stream = zstandard.open(path, "rb")
+
+    if mode == "rt":
+        return io.TextIOWrapper(stream, encoding="utf-8", errors="ignore")
+    return stream
+
+
+def find_logs(directory: Path, pattern: str = "*.log", recursive: bool = False) -> List[Path]:
+    """Sorted files matching `pattern`, including compressed copies (``*.log.gz`` etc.)."""
+
+    directory = Path(directory)
+    glob = directory.rglob if recursive else directory.glob
+    found = set(glob(pattern))
+    for suffix in COMPRESSED_SUFFIXES:
+        found.update(glob(pattern + suffix))
+    return sorted(found)
+
+
+def _read_all(path: Path) -> bytes:
+    with open_nufeb(path) as f:
+        return f.read()
+
+
+# A thermo table ends at the ``Loop time of ...`` summary written after each ``run``.
+_THERMO_END = b"\nLoop time of "
+# Candidate data rows start (after indentation) with a digit, sign or decimal point.
+_THERMO_ROW = re.compile(rb"\n([ \t]*[-+.\d][^\n]*)")
+
+# Thermo columns that stay floating point even if every value happens to be integral.
+_FLOAT_COLUMNS = {"CPU", "Time", "Dt", "Temp", "Press", "PotEng", "KinEng", "TotEng"}
+
+
+def _find_thermo_headers(data: bytes) -> List[tuple[int, int]]:
+    """Return ``(line_start, line_end)`` of every line whose first token is ``Step``."""
+
+    found = []
+    pos = data.find(b"Step")
+    while pos != -1:
+        line_start = data.rfind(b"\n", 0, pos) + 1
+        line_end = data.find(b"\n", pos)
+        if line_end == -1:
+            line_end = len(data)
+        if not data[line_start:pos].strip() and data[pos + 4:pos + 5] in (b" ", b"\t"):
+            found.append((line_start, line_end))
+        pos = data.find(b"Step", line_end)
+    return found
+
+
+def _tokens_per_row(rows: Sequence[bytes]) -> np.ndarray:
+    """Count whitespace-separated fields of every row without splitting them in Python."""
+
+    buf = np.frombuffer(b"\n" + b"\n".join(rows), dtype=np.uint8)
+    solid = buf > ord(" ")
+    starts = solid[1:] & ~solid[:-1]
+    row_start = np.flatnonzero(buf[:-1] == ord("\n"))
+    return np.add.reduceat(starts, row_start) if len(row_start) else np.zeros(0, dtype=np.intp)
+
+
+def _is_numeric_row(row: bytes) -> bool:
+    try:
+        [float(tok) for tok in row.split()]
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_thermo_block(
+    data: bytes, start: int, stop: int, headers: Sequence[str], keep: Sequence[str]
+) -> Dict[str, np.ndarray]:
+    """Bulk-convert the numeric rows of the block ``data[start:stop]`` into the `keep` columns.
+
+    Solver chatter interleaved with the table (``diffusion: 1175 steps``,
+    the ``timestep=...`` printf lines of the growth fixes, warnings) is
+    dropped, as are truncated or garbled rows. The block is searched in
+    place, without slicing a copy out of `data`.
+    """
+
+    return _parse_thermo_rows(_THERMO_ROW.findall(data, start, stop), headers, keep)
+
+
+def _parse_thermo_rows(rows: List[bytes], headers: Sequence[str], keep: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Convert candidate thermo `rows` (raw lines) into the `keep` columns."""
+
+    n_cols = len(headers)
+    usecols = [headers.index(c) for c in keep]
+    if rows and len(rows[-1].split()) != n_cols:
+        rows.pop()  # last line of a run killed mid-write
+    if not rows:
+        return {name: np.empty(0, dtype=np.float64) for name in keep}
+    try:
+        values = np.loadtxt(rows, dtype=np.float64, usecols=usecols, ndmin=2)
+    except ValueError:
+        # Some row mid-table is malformed (e.g. output clobbered by another rank).
+        ok = _tokens_per_row(rows) == n_cols
+        rows = [r for r, good in zip(rows, ok) if good and _is_numeric_row(r)]
+        values = np.loadtxt(rows, dtype=np.float64, usecols=usecols, ndmin=2)
+
+    columns: Dict[str, np.ndarray] = {}
+    for j, name in enumerate(keep):
+        col = values[:, j]
+        if name not in _FLOAT_COLUMNS and np.all(np.isfinite(col)) and np.all(col == np.rint(col)):
+            col = col.astype(np.int64)
+        columns[name] = np.ascontiguousarray(col)
+    return columns
+
+
+def read_thermo(path: Path, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    """Read every thermo table of a NUFEB log into one columnar DataFrame.
+
+    Each ``Step ...`` header starts a block that runs until the matching
+    ``Loop time of`` line (or the next header / end of file), so logs with
+    several ``run`` commands and truncated logs are both handled. The
+    numeric rows of a block are converted in one shot with NumPy instead of
+    line by line. A ``run`` column holds the 0-based block index.
+
+    If `columns` is given only those thermo columns (plus ``run``) are kept;
+    blocks that lack any of them are skipped.
+    """
+
+    data = _read_all(path)
+
+    blocks: List[pd.DataFrame] = []
+    headers_found = _find_thermo_headers(data)
+    for i, (line_start, start) in enumerate(headers_found):
+        headers = data[line_start:start].decode("ascii", errors="ignore").split()
+        if columns is not None and not all(c in headers for c in columns):
+            continue
+
+        stop = headers_found[i + 1][0] if i + 1 < len(headers_found) else len(data)
+        # the summary closes the block, so search back from its end
+        end = data.rfind(_THERMO_END, start, stop)
+        if end != -1:
+            stop = end + 1
+
+        cols = _parse_thermo_block(data, start, stop, headers, headers if columns is None else columns)
+        df = pd.DataFrame(cols)
+        df.insert(0, "run", np.full(len(df), i, dtype=np.int64))
+        blocks.append(df)
+
+    if not blocks:
+        return pd.DataFrame(columns=["run"] + list(columns or ["Step"]))
+    return pd.concat(blocks, ignore_index=True)
+
+
+@dataclass
+class ThermoIndex:
+    """Byte offsets of every thermo row of a log, keyed by step.
+
+    Row ``i`` belongs to block ``block[i]`` (whose column names are
+    ``headers[block[i]]``) and spans ``log[start[i]:end[i]]``. `size` and
+    `mtime_ns` identify the log version the index was built from.
+    """
+
+    headers: List[List[str]]
+    block: np.ndarray
+    step: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    size: int
+    mtime_ns: int
+
+    def save(self, path: Path) -> None:
+        with Path(path).open("wb") as f:
+            np.savez(
+                f,
+                headers=np.array(json.dumps(self.headers)),
+                block=self.block,
+                step=self.step,
+                start=self.start,
+                end=self.end,
+                version=np.array([self.size, self.mtime_ns], dtype=np.int64),
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "ThermoIndex":
+        with np.load(path, allow_pickle=False) as z:
+            size, mtime_ns = (int(v) for v in z["version"])
+            return cls(
+                headers=json.loads(str(z["headers"])),
+                block=z["block"],
+                step=z["step"],
+                start=z["start"],
+                end=z["end"],
+                size=size,
+                mtime_ns=mtime_ns,
+            )
+
+
+def _open_mmap(path: Path) -> mmap.mmap | bytes:
+    with Path(path).open("rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return b""
+
+
+def build_thermo_index(path: Path) -> ThermoIndex:
+    """Scan a log once (memory-mapped) and record where every thermo row lives.
+
+    The input echo before the first ``Step`` header is skipped with a plain
+    substring search; only the thermo blocks are walked row by row.
+    Compressed logs cannot be memory-mapped; their offsets refer to the
+    decompressed stream.
+    """
+
+    st = Path(path).stat()
+    mm = _open_mmap(path) if detect_compression(path) is None else _read_all(path)
+    headers: List[List[str]] = []
+    block: List[int] = []
+    step: List[int] = []
+    start: List[int] = []
+    end: List[int] = []
+    try:
+        found = _find_thermo_headers(mm)
+        for i, (line_start, begin) in enumerate(found):
+            names = mm[line_start:begin].decode("ascii", errors="ignore").split()
+            headers.append(names)
+            stop = found[i + 1][0] if i + 1 < len(found) else len(mm)
+            loop = mm.find(_THERMO_END, begin, stop)
+            if loop != -1:
+                stop = loop + 1
+            step_col = names.index("Step")
+            for m in _THERMO_ROW.finditer(mm, begin, stop):
+                tokens = m.group(1).split()
+                if len(tokens) != len(names) or not tokens[step_col].isdigit():
+                    continue
+                block.append(i)
+                step.append(int(tokens[step_col]))
+                start.append(m.start(1))
+                end.append(m.end(1))
+    finally:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+
+    return ThermoIndex(
+        headers=headers,
+        block=np.asarray(block, dtype=np.int64),
+        step=np.asarray(step, dtype=np.int64),
+        start=np.asarray(start, dtype=np.int64),
+        end=np.asarray(end, dtype=np.int64),
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+    )
+
+
+def thermo_index_path(path: Path) -> Path:
+    """Default location of the persisted index: ``<log>.idx.npz`` next to the log."""
+
+    path = Path(path)
+    return path.with_name(path.name + ".idx.npz")
+
+
+def load_thermo_index(path: Path, index_path: Path | None = None, persist: bool = True) -> ThermoIndex:
+    """Return the step index of a log, rebuilding it if the log changed.
+
+    The index is cached in `index_path` (default `thermo_index_path`) and is
+    considered stale when the log's size or mtime differ from when it was built.
+    """
+
+    index_path = Path(index_path) if index_path is not None else thermo_index_path(path)
+    st = Path(path).stat()
+    if index_path.exists():
+        try:
+            index = ThermoIndex.load(index_path)
+        except (OSError, ValueError, KeyError):
+            index = None
+        if index is not None and index.size == st.st_size and index.mtime_ns == st.st_mtime_ns:
+            return index
+
+    index = build_thermo_index(path)
+    if persist:
+        try:
+            index.save(index_path)
+        except OSError:
+            pass  # read-only data directory: keep the in-memory index
+    return index
+
+
+def read_thermo_steps(
+    path: Path,
+    step_min: Optional[int] = None,
+    step_max: Optional[int] = None,
+    last: Optional[int] = None,
+    columns: Sequence[str] | None = None,
+    index_path: Path | None = None,
+) -> pd.DataFrame:
+    """Read only the thermo rows with ``step_min <= Step <= step_max``.
+
+    With `last`, only the last N of those rows are returned. The rows are
+    located through the persisted step index (see `load_thermo_index`) and
+    read from a memory map, so only the bytes of the selected rows are
+    touched. The result has the same layout as `read_thermo`.
+
+    Compressed logs have no random access: they are streamed in full and
+    the index only saves the row search.
+    """
+
+    index = load_thermo_index(path, index_path)
+    sel = np.ones(len(index.step), dtype=bool)
+    if step_min is not None:
+        sel &= index.step >= step_min
+    if step_max is not None:
+        sel &= index.step <= step_max
+    rows = np.flatnonzero(sel)
+    if last is not None:
+        rows = rows[max(len(rows) - last, 0):] if last > 0 else rows[:0]
+
+    blocks: List[pd.DataFrame] = []
+    mm = _open_mmap(path) if detect_compression(path) is None else _read_all(path)
+    try:
+        for b in np.unique(index.block[rows]):
+            headers = index.headers[b]
+            if columns is not None and not all(c in headers for c in columns):
+                continue
+            in_block = rows[index.block[rows] == b]
+            lines = [mm[s:e] for s, e in zip(index.start[in_block], index.end[in_block])]
+            cols = _parse_thermo_rows(lines, headers, headers if columns is None else columns)
+            df = pd.DataFrame(cols)
+            df.insert(0, "run", np.full(len(df), b, dtype=np.int64))
+            blocks.append(df)
+    finally:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+
+    if not blocks:
+        return pd.DataFrame(columns=["run"] + list(columns or ["Step"]))
+    return pd.concat(blocks, ignore_index=True)
+
+
+class ThermoFollower:
+    """Incremental thermo parser for a log that is still being written.
+
+    Feed it the bytes appended since the last call; it returns the complete
+    thermo rows they contain as ``{column: value}`` dicts (plus ``run``, the
+    0-based block index). A partial last line is kept until it is finished.
+    """
+
+    def __init__(self) -> None:
+        self.headers: Optional[List[str]] = None
+        self.run = -1
+        self._pending = b""
+
+    def feed(self, data: bytes) -> List[Dict[str, float]]:
+        *lines, self._pending = (self._pending + data).split(b"\n")
+        rows = []
+        for line in lines:
+            tokens = line.split()
+            if not tokens:
+                continue
+            if tokens[0] == b"Step":
+                self.headers = [t.decode("ascii", errors="ignore") for t in tokens]
+                self.run += 1
+                continue
+            if self.headers is None:
+                continue
+            if line.startswith(b"Loop time of"):
+                self.headers = None
+                continue
+            if len(tokens) != len(self.headers):
+                continue
+            try:
+                values = [float(t) for t in tokens]
+            except ValueError:
+                continue
+            row: Dict[str, float] = dict(zip(self.headers, values))
+            row["run"] = self.run
+            rows.append(row)
+        return rows
 
-def read_simple_tsv(path: Path) -> pd.DataFrame:
-    """Example helper for reading a TSV table exported from NUFEB.
 
-    Replace with a parser tailored to your own outputs.
+def follow_thermo(
+    path: Path,
+    alive: Callable[[], bool],
+    poll_interval: float = 1.0,
+) -> Iterator[Dict[str, float]]:
+    """Yield thermo rows of `path` as they are appended, like ``tail -f``.
+
+    Polling stops once `alive()` returns False (e.g. the simulation process
+    exited) and the rest of the file has been read. The log does not need
+    to exist yet when following starts.
+    """
+
+    path = Path(path)
+    follower = ThermoFollower()
+    offset = 0
+    while True:
+        running = alive()
+        if path.exists():
+            with path.open("rb") as f:
+                f.seek(offset)
+                data = f.read()
+            offset += len(data)
+            yield from follower.feed(data)
+        if not running:
+            return
+        time.sleep(poll_interval)
+
+
+_LOOP_LINE = re.compile(
+    rb"^Loop time of (?P<loop_time>\S+) on (?P<procs>\d+) procs for (?P<steps>\d+) steps with (?P<atoms>\d+) atoms",
+    flags=re.MULTILINE,
+)
+_CPU_USE_LINE = re.compile(
+    rb"^(?P<cpu_use_pct>[\d.]+)% CPU use with (?P<mpi_tasks>\d+) MPI tasks x (?P<omp_threads>\d+) OpenMP threads",
+    flags=re.MULTILINE,
+)
+_TIMING_ROW = re.compile(rb"^(?P<section>[A-Za-z]+)\s*\|(?P<values>[^\n]*)$", flags=re.MULTILINE)
+_TIMING_FIELDS = ("min", "avg", "max", "varavg", "pct")
+
+
+def _float_or_nan(tok: bytes) -> float:
+    tok = tok.strip()
+    return float(tok) if tok else float("nan")
+
+
+def read_timing(path: Path) -> pd.DataFrame:
+    """Parse the ``Loop time of ...`` summaries and MPI timing tables of a log.
+
+    One row per completed ``run``, in log order. The columns are
+    ``loop_time``, ``procs``, ``steps``, ``atoms``, ``cpu_use_pct``,
+    ``mpi_tasks`` and ``omp_threads``, then ``<section>_<field>`` for every
+    section of the ``MPI task timing breakdown`` (pair, neigh, comm, output,
+    modify, other). The fields are min/avg/max time, ``varavg`` (%varavg)
+    and ``pct`` (%total). Blank cells become NaN.
+    """
+
+    data = _read_all(path)
+    loops = list(_LOOP_LINE.finditer(data))
+    records = []
+    for i, m in enumerate(loops):
+        stop = loops[i + 1].start() if i + 1 < len(loops) else len(data)
+        rec: Dict[str, Any] = {
+            "run": i,
+            "loop_time": float(m.group("loop_time")),
+            "procs": int(m.group("procs")),
+            "steps": int(m.group("steps")),
+            "atoms": int(m.group("atoms")),
+        }
+        cpu = _CPU_USE_LINE.search(data, m.end(), stop)
+        if cpu is not None:
+            rec["cpu_use_pct"] = float(cpu.group("cpu_use_pct"))
+            rec["mpi_tasks"] = int(cpu.group("mpi_tasks"))
+            rec["omp_threads"] = int(cpu.group("omp_threads"))
+
+        table = data.find(b"\nSection |", m.end(), stop)
+        if table != -1:
+            table_end = data.find(b"\n\n", table + 1, stop)
+            for row in _TIMING_ROW.finditer(data, table + 1, stop if table_end == -1 else table_end):
+                section = row.group("section").decode().lower()
+                if section == "section":
+                    continue
+                cells = row.group("values").split(b"|")
+                for field, cell in zip(_TIMING_FIELDS, cells):
+                    rec[f"{section}_{field}"] = _float_or_nan(cell)
+        records.append(rec)
+    return pd.DataFrame.from_records(records)
+
+
+# Columns stored in the Parquet thermo archive and their (nullable) dtypes.
+ARCHIVE_COLUMNS = {
+    "Step": "Int64",
+    "CPU": "float64",
+    "Atoms": "Int64",
+    "v_ncross1": "Int64",
+    "v_ncross2": "Int64",
+    "v_ncheater": "Int64",
+    "v_ndead": "Int64",
+    "v_neps": "Int64",
+    "v_mass": "float64",
+}
+ARCHIVE_PARTITIONS = ("condition", "param_set", "seed")
+
+_RUN_NAME = re.compile(r"(?P<condition>cheps|neps|eps)(?P<seed>\d+)", flags=re.IGNORECASE)
+
+
+def parse_run_name(name: str) -> tuple[str, int] | None:
+    """Return ``(condition, seed)`` for names like ``neps41.log`` or ``inputscript_CHEPS7.nufeb``."""
+
+    m = _RUN_NAME.search(name)
+    if m is None:
+        return None
+    return m.group("condition").lower(), int(m.group("seed"))
+
+
+def archive_run_path(root: Path, condition: str, param_set: str, seed: int) -> Path:
+    """Hive-style partition file for one run: ``condition=.../param_set=.../seed=.../thermo.parquet``."""
+
+    return Path(root) / f"condition={condition}" / f"param_set={param_set}" / f"seed={seed}" / "thermo.parquet"
+
+
+def write_thermo_archive(log_path: Path, out_path: Path) -> int:
+    """Convert the thermo tables of one log into a single Parquet file.
+
+    Every `ARCHIVE_COLUMNS` entry is written with a fixed dtype (missing
+    columns become nulls) so that all partitions share one schema. Return
+    the number of rows written.
     """
 
-    return pd.read_csv(path, sep="\t")
+    df = read_thermo(log_path)
+    table = pd.DataFrame({"run": df["run"].astype("int32")} if "run" in df else {"run": pd.Series(dtype="int32")})
+    for col, dtype in ARCHIVE_COLUMNS.items():
+        table[col] = df[col].astype(dtype) if col in df else pd.Series(pd.NA, index=df.index, dtype=dtype)
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(".parquet.tmp")
+    table.to_parquet(tmp, index=False, compression="zstd")
+    tmp.replace(out_path)
+    return len(table)
+
+
+def load_thermo_archive(
+    root: Path,
+    columns: Sequence[str] | None = None,
+    condition: Sequence[str] | None = None,
+    param_set: Sequence[str] | None = None,
+    seed: Sequence[int] | None = None,
+    filters: List[tuple] | None = None,
+) -> pd.DataFrame:
+    """Load thermo time series from the Parquet archive.
+
+    Only the requested `columns` are read, and partitions are pruned by
+    `condition`, `param_set` and `seed` before any file is opened. Extra
+    row-level `filters` (pyarrow DNF tuples such as ``("Step", ">=", 200)``)
+    are pushed down to the Parquet reader. Partition keys are always
+    included in the result. Requires pyarrow.
+    """
+
+    pushdown: List[tuple] = list(filters or [])
+    if condition is not None:
+        pushdown.append(("condition", "in", list(condition)))
+    if param_set is not None:
+        pushdown.append(("param_set", "in", list(param_set)))
+    if seed is not None:
+        pushdown.append(("seed", "in", [int(s) for s in seed]))
+    if columns is not None:
+        columns = list(ARCHIVE_PARTITIONS) + [c for c in columns if c not in ARCHIVE_PARTITIONS]
+
+    df = pd.read_parquet(root, engine="pyarrow", columns=columns, filters=pushdown or None)
+    for key in ARCHIVE_PARTITIONS:
+        if key in df and isinstance(df[key].dtype, pd.CategoricalDtype):
+            df[key] = df[key].astype(df[key].cat.categories.dtype)
+    return df
+
+
+# --------------------------------------------------------------------------- #
+# VTK XML particle dumps (``dump ... vtk ... dump*.vtu``)
+
+_VTK_DTYPES = {
+    "Int8": "i1", "UInt8": "u1", "Int16": "i2", "UInt16": "u2",
+    "Int32": "i4", "UInt32": "u4", "Int64": "i8", "UInt64": "u8",
+    "Float32": "f4", "Float64": "f8",
+}
+_XML_ATTR = re.compile(rb'([A-Za-z_:]+)\s*=\s*"([^"]*)"')
+_VTU_SECTION = re.compile(rb"<(/?)(PointData|Points|CellData|Cells)\b[^>]*?(/?)>")
+_VTU_ARRAY = re.compile(rb"<DataArray\b([^>]*?)(/>|>(.*?)</DataArray>)", flags=re.DOTALL)
+_VTU_STEP = re.compile(r"(\d+)\.vtu")
+
+
+def _xml_attrs(tag: bytes) -> Dict[str, str]:
+    return {k.decode(): v.decode() for k, v in _XML_ATTR.findall(tag)}
+
+
+def _b64_chars(n_bytes: int) -> int:
+    return 4 * -(-n_bytes // 3)
+
+
+def _decode_raw(buf: bytes | memoryview, offset: int, dtype: np.dtype, header: np.dtype, compressed: bool) -> np.ndarray:
+    """Decode one header-prefixed binary array starting at ``buf[offset]``.
+
+    Uncompressed data is returned as a view on `buf` (no copy).
+    """
+
+    hsize = header.itemsize
+    if not compressed:
+        nbytes = int(np.frombuffer(buf, header, 1, offset)[0])
+        return np.frombuffer(buf, dtype, nbytes // dtype.itemsize, offset + hsize)
+
+    n_blocks = int(np.frombuffer(buf, header, 1, offset)[0])
+    sizes = np.frombuffer(buf, header, n_blocks, offset + 3 * hsize)
+    pos = offset + (3 + n_blocks) * hsize
+    chunks = []
+    for size in sizes:
+        chunks.append(zlib.decompress(buf[pos:pos + int(size)]))
+        pos += int(size)
+    return np.frombuffer(b"".join(chunks), dtype)
+
+
+def _decode_base64(text: bytes, dtype: np.dtype, header: np.dtype, compressed: bool) -> np.ndarray:
+    """Decode a base64 array whose header was encoded separately (VTK) or jointly with the data."""
+
+    text = b"".join(text.split())
+    hsize = header.itemsize
+    if compressed:
+        n_blocks = int(np.frombuffer(base64.b64decode(text[:4 * hsize]), header, 1)[0])
+        hchars = _b64_chars((3 + n_blocks) * hsize)
+        head = base64.b64decode(text[:hchars])
+        expected = (3 + n_blocks) * hsize
+        if len(head) == expected or len(text) == hchars:
+            return _decode_raw(head + base64.b64decode(text[hchars:]), 0, dtype, header, True)
+        return _decode_raw(base64.b64decode(text), 0, dtype, header, True)
+
+    hchars = _b64_chars(hsize)
+    nbytes = int(np.frombuffer(base64.b64decode(text[:hchars])[:hsize], header, 1)[0])
+    body = base64.b64decode(text[hchars:])
+    if len(body) == nbytes or (len(body) > nbytes and len(body) - nbytes < 3):
+        return np.frombuffer(body, dtype, nbytes // dtype.itemsize)
+    joint = base64.b64decode(text)
+    return np.frombuffer(joint, dtype, nbytes // dtype.itemsize, hsize)
+
+
+def _vtk_header(head: bytes) -> tuple[Dict[str, str], List[tuple[str, Dict[str, str], bytes | None]]]:
+    """``VTKFile`` attributes and ``(section, attrs, inline text)`` of every DataArray in `head`."""
+
+    tag = head.find(b"<VTKFile")
+    root = _xml_attrs(head[tag:head.find(b">", tag)])
+    sections = [(m.start(), m.group(2).decode(), not m.group(1) and not m.group(3)) for m in _VTU_SECTION.finditer(head)]
+    arrays = []
+    for m in _VTU_ARRAY.finditer(head):
+        section = None
+        for pos, name, opening in sections:
+            if pos > m.start():
+                break
+            section = name if opening else None
+        if section is not None:
+            arrays.append((section, _xml_attrs(m.group(1)), m.group(3)))
+    return root, arrays
+
+
+def _vtk_dtypes(root: Dict[str, str]) -> tuple[str, np.dtype]:
+    order = ">" if root.get("byte_order") == "BigEndian" else "<"
+    return order, np.dtype(order + _VTK_DTYPES[root.get("header_type", "UInt32")])
+
+
+def _read_vtk_arrays(
+    path: Path, sections: Sequence[str], names: Optional[Sequence[str]] = None
+) -> tuple[bytes, List[tuple[str, Dict[str, str], np.ndarray]]]:
+    """Decode the DataArrays of a VTK XML file that sit in one of `sections`.
+
+    With `names`, only the arrays of those names are decoded. Uncompressed
+    raw arrays are views on the file buffer, which they keep alive.
+
+    Returns the XML head (everything before the appended data) and
+    ``(section, attrs, values)`` per array, values flat.
+    """
+
+    data = _read_all(path)
+    app = data.find(b"<AppendedData")
+    head = data if app == -1 else data[:app]
+    root, arrays = _vtk_header(head)
+    order, header = _vtk_dtypes(root)
+    compressed = "compressor" in root
+
+    appended: bytes | memoryview = b""
+    app_base64 = False
+    if app != -1:
+        app_tag_end = data.find(b">", app)
+        app_base64 = _xml_attrs(data[app:app_tag_end]).get("encoding", "raw") == "base64"
+        start = data.find(b"_", app_tag_end) + 1
+        end = data.rfind(b"</AppendedData>")
+        end = end if end != -1 else len(data)
+        # raw arrays are views on the file buffer; base64 text is decoded into new bytes anyway
+        appended = data[start:end].rstrip() if app_base64 else memoryview(data)[start:end]
+
+    offsets = sorted(int(a["offset"]) for _, a, _ in arrays if a.get("format") == "appended")
+
+    out = []
+    for section, attrs, text in arrays:
+        if section not in sections or (names is not None and attrs.get("Name") not in names):
+            continue
+        dtype = np.dtype(order + _VTK_DTYPES[attrs["type"]])
+        fmt = attrs.get("format", "ascii")
+        if fmt == "ascii":
+            values = np.array(text.split(), dtype=dtype)
+        elif fmt == "binary":
+            values = _decode_base64(text, dtype, header, compressed)
+        else:
+            offset = int(attrs["offset"])
+            if app_base64:
+                later = [o for o in offsets if o > offset]
+                values = _decode_base64(appended[offset:later[0] if later else len(appended)], dtype, header, compressed)
+            else:
+                values = _decode_raw(appended, offset, dtype, header, compressed)
+        out.append((section, attrs, values))
+    return head, out
+
+
+def read_vtu(path: Path, float32: bool = False) -> ParticleFrame:
+    """Read a NUFEB/LAMMPS ``.vtu`` particle dump without VTK.
+
+    Handles ``ascii``, inline base64 ``binary`` and ``appended`` data
+    (raw or base64), with or without zlib compression. Decoding never
+    copies: uncompressed raw ``id``/``type``/``diameter`` arrays stay views
+    on the file buffer. The one copy is the split of the interleaved points
+    into the contiguous ``x``/``y``/``z`` columns `ParticleFrame` stores.
+    Other point-data arrays end up in ``frame.extra``.
+    """
+
+    _, arrays = _read_vtk_arrays(path, ("PointData", "Points"))
+    columns: Dict[str, np.ndarray] = {}
+    for section, attrs, values in arrays:
+        n_comp = int(attrs.get("NumberOfComponents", 1))
+        if section == "Points":
+            points = values.reshape(-1, 3)
+            columns["x"], columns["y"], columns["z"] = points[:, 0], points[:, 1], points[:, 2]
+        else:
+            columns[attrs.get("Name", f"array{len(columns)}")] = values if n_comp == 1 else values.reshape(-1, n_comp)
+    return ParticleFrame.from_arrays(columns, float32)
+
+
+def vtu_type_counts(path: Path, minlength: int = 0) -> np.ndarray:
+    """``np.bincount`` of the ``type`` array of a dump, decoding no other array."""
+
+    _, arrays = _read_vtk_arrays(path, ("PointData",), names=("type",))
+    if not arrays:
+        raise ValueError(f"no 'type' point array in {path}")
+    return np.bincount(arrays[0][2].astype(np.intp, copy=False), minlength=minlength)
+
+
+def read_data_file(path: Path, float32: bool = False) -> tuple[ParticleFrame, np.ndarray]:
+    """Read a LAMMPS data file (``atom_ch.in``) of the NUFEB ``coccus`` style.
+
+    Atom lines are ``id type diameter density x y z outer_diameter``.
+    Returns the particles (``density`` and ``outer_diameter`` in
+    ``frame.extra``) and the box as ``[[xlo, xhi], [ylo, yhi], [zlo, zhi]]``.
+    """
+
+    with open_nufeb(path, "rt") as f:
+        lines = f.readlines()
+
+    box = np.zeros((3, 2))
+    start = None
+    for i, line in enumerate(lines):
+        parts = line.split()
+        if len(parts) == 4 and parts[2:] in (["xlo", "xhi"], ["ylo", "yhi"], ["zlo", "zhi"]):
+            box["xyz".index(parts[2][0])] = float(parts[0]), float(parts[1])
+        elif line.strip().startswith("Atoms"):
+            start = i + 1
+            break
+    if start is None:
+        raise RuntimeError(f"Cannot find 'Atoms' section in {path}.")
+
+    body = []
+    for line in lines[start:]:
+        if not line.strip():
+            if body:
+                break
+            continue
+        if line.lstrip()[0].isalpha():
+            break
+        body.append(line.split("#", 1)[0])
+
+    table = np.loadtxt(body, ndmin=2) if body else np.empty((0, 8))
+    extra = {"density": table[:, 3]}
+    if table.shape[1] > 7:
+        extra["outer_diameter"] = table[:, 7]
+    frame = ParticleFrame(
+        table[:, 0].astype(np.int64), table[:, 1].astype(np.int32), table[:, 2],
+        table[:, 4], table[:, 5], table[:, 6], extra, float32,
+    )
+    return frame, box
+
+
+def vtu_series(directory: Path, pattern: str = "dump*.vtu") -> List[tuple[int, Path]]:
+    """``(step, path)`` for every dump in `directory`, sorted by step.
+
+    The step is the number in front of ``.vtu`` (LAMMPS replaces the ``*``
+    of ``dump*.vtu`` with the timestep). Compressed dumps are included.
+    """
+
+    series = []
+    for p in find_logs(directory, pattern):
+        m = _VTU_STEP.search(p.name)
+        if m is not None:
+            series.append((int(m.group(1)), p))
+    return sorted(series)
+
+
+def iter_vtu_frames(
+    directory: Path,
+    pattern: str = "dump*.vtu",
+    step_min: Optional[int] = None,
+    step_max: Optional[int] = None,
+    stride: int = 1,
+    float32: bool = False,
+) -> Iterator[tuple[int, ParticleFrame]]:
+    """Lazily yield ``(step, frame)`` for a dump series, one frame in memory at a time."""
+
+    series = [
+        (step, p)
+        for step, p in vtu_series(directory, pattern)
+        if (step_min is None or step >= step_min) and (step_max is None or step <= step_max)
+    ]
+    for step, p in series[::stride]:
+        yield step, read_vtu(p, float32)
+
+
+def write_data_file(
+    path: Path,
+    frame: ParticleFrame,
+    box: Sequence[Sequence[float]],
+    n_types: Optional[int] = None,
+    title: str = "NUFEB Simulation",
+    precision: int = 6,
+) -> None:
+    """Write `frame` as a ``coccus``-style LAMMPS data file (see `read_data_file`).
+
+    `box` is ``[[xlo, xhi], [ylo, yhi], [zlo, zhi]]``. ``density`` and
+    ``outer_diameter`` are taken from ``frame.extra`` (default 500 kg/m3
+    and the diameter). The atom table is written in one `np.savetxt`
+    call.
+    """
+
+    n = len(frame)
+    n_types = n_types or (int(frame.type.max()) if n else 1)
+    density = frame.extra.get("density", np.full(n, 500.0))
+    outer = frame.extra.get("outer_diameter", frame.diameter)
+    header = [f"{title}\n", f"     {n} atoms", f"     {n_types} atom types\n"]
+    for (lo, hi), axis in zip(box, "xyz"):
+        header.append(f"  {lo:.{precision}e}   {hi:.{precision}e}  {axis}lo {axis}hi")
+    header.append("\nAtoms\n")
+
+    table = np.empty((n, 8))
+    table[:, 0], table[:, 1], table[:, 2], table[:, 3] = frame.id, frame.type, frame.diameter, density
+    table[:, 4], table[:, 5], table[:, 6], table[:, 7] = frame.x, frame.y, frame.z, outer
+    e = f"%.{precision}e"
+    with Path(path).open("w") as f:
+        f.write("\n".join(header) + "\n")
+        np.savetxt(f, table, fmt=["%d", "%d", e, "%.0f", e, e, e, e])
+
+
+def read_simple_tsv(path: Path) -> pd.DataFrame:
+    """Read a tab-separated table (e.g. one exported from a NUFEB run), compressed or not."""
+
+    with open_nufeb(path) as f:
+        return pd.read_csv(f, sep="\t")
 
 
 def load_summary_table(path: Path) -> pd.DataFrame:
     """Load an aggregated summary table (e.g. collapse times)."""
 
-    return pd.read_csv(path)
+    with open_nufeb(path) as f:
+        return pd.read_csv(f)
@@ -0,0 +1,138 @@
+"""SQLite manifest that caches per-file analysis results across runs.
+
+Files are tracked by path, size, mtime and a content hash. Results are
+stored per (content hash, analysis kind), so a log is only re-analysed
+when its bytes change, and byte-identical copies share one result.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    digest TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (digest, kind)
+);
+"""
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """BLAKE2b hex digest of the file contents."""
+
+    h = hashlib.blake2b(digest_size=20)
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Manifest:
+    """Path → content-hash index plus a result cache keyed on the hash."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self) -> "Manifest":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def digest(self, path: Path) -> str:
+        """Return the content hash of `path`, re-hashing only if size or mtime changed."""
+
+        key = str(Path(path).resolve())
+        st = Path(path).stat()
+        row = self._conn.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (key,)).fetchone()
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+
+        digest = file_digest(path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+            (key, st.st_size, st.st_mtime_ns, digest),
+        )
+        return digest
+
+    def get(self, digest: str, kind: str) -> Optional[Any]:
+        row = self._conn.execute("SELECT value FROM results WHERE digest = ? AND kind = ?", (digest, kind)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def has(self, digest: str, kind: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM results WHERE digest = ? AND kind = ?", (digest, kind)).fetchone() is not None
+
+    def put(self, digest: str, kind: str, value: Any) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (digest, kind, value) VALUES (?, ?, ?)",
+            (digest, kind, json.dumps(value)),
+        )
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+
+def map_files(
+    func: Callable[[Path], Any],
+    paths: Sequence[Path],
+    jobs: int = 1,
+    manifest: Optional[Manifest] = None,
+    kind: str = "",
+    keys: Optional[Sequence[str]] = None,
+) -> List[Any]:
+    """Apply `func` to every path and return results in input order.
+
+    With a `manifest`, results are looked up by content hash under `kind`
+    (which should encode every analysis parameter and a code version such
+    as `io_nufeb.PARSER_VERSION`); only files whose
+    contents have not been seen before are passed to `func`, once per
+    distinct content. `keys`, one per path, replace the content hash as
+    cache key where a path is not a single file (e.g. a dump directory).
+    `func` must return a JSON-serialisable value and be picklable when
+    ``jobs > 1``.
+    """
+
+    if manifest is None:
+        return _run(func, list(paths), jobs)
+
+    digests = list(keys) if keys is not None else [manifest.digest(p) for p in paths]
+    todo: Dict[str, Path] = {}
+    for p, d in zip(paths, digests):
+        if d not in todo and not manifest.has(d, kind):
+            todo[d] = p
+
+    for d, value in zip(todo, _run(func, list(todo.values()), jobs)):
+        manifest.put(d, kind, value)
+    manifest.commit()
+
+    values = {d: manifest.get(d, kind) for d in set(digests)}
+    return [values[d] for d in digests]
+
+
+def _run(func: Callable[[Path], Any], paths: List[Path], jobs: int) -> List[Any]:
+    if jobs <= 1 or len(paths) <= 1:
+        return [func(p) for p in paths]
+
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(func, paths, chunksize=chunksize))
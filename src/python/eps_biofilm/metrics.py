@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Sequence, Mapping
+from pathlib import Path
+from typing import Dict, List, Sequence, Mapping, Optional
 import numpy as np
 import pandas as pd
 
+from .io_nufeb import vtu_series, vtu_type_counts
+from .particles import CROSS_TYPES
+
 
 def estimate_collapse_time(time: Sequence[float], total_biomass: Sequence[float], threshold: float) -> float:
     """Return first time where biomass falls below `threshold`.
@@ -21,6 +25,76 @@ def estimate_collapse_time(time: Sequence[float], total_biomass: Sequence[float]
     return float(t[idx[0]])
 
 
+def first_step_below(
+    steps: Sequence[int],
+    counts: Sequence[Sequence[float]],
+    thresholds: Sequence[float],
+) -> Optional[int]:
+    """Return the first step at which every series in `counts` is below its threshold.
+
+    `thresholds` holds one value per series, or a single value shared by all.
+    Return None if the populations never all drop below their thresholds.
+    """
+
+    if len(thresholds) == 1:
+        thresholds = list(thresholds) * len(counts)
+    if len(thresholds) != len(counts):
+        raise ValueError(f"got {len(thresholds)} thresholds for {len(counts)} count series")
+
+    below = np.ones(len(steps), dtype=bool)
+    for c, thr in zip(counts, thresholds):
+        below &= np.asarray(c) < thr
+    idx = np.flatnonzero(below)
+    if len(idx) == 0:
+        return None
+    return int(np.asarray(steps)[idx[0]])
+
+
+class CollapseDetector:
+    """Streaming version of `first_step_below` for rows arriving one at a time.
+
+    `update` returns the lifetime step once every column in `columns` has
+    been below its threshold for `patience` consecutive rows; the lifetime
+    is the first step of that streak, so ``patience=1`` matches
+    `first_step_below` on the full table.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str] = ("v_ncross1", "v_ncross2"),
+        thresholds: Sequence[float] = (50.0,),
+        patience: int = 1,
+    ) -> None:
+        if len(thresholds) == 1:
+            thresholds = list(thresholds) * len(columns)
+        if len(thresholds) != len(columns):
+            raise ValueError(f"got {len(thresholds)} thresholds for {len(columns)} columns")
+        self.columns = list(columns)
+        self.thresholds = list(thresholds)
+        self.patience = max(1, patience)
+        self._streak_start: Optional[int] = None
+        self._streak = 0
+        self.lifetime: Optional[int] = None
+
+    def missing(self, row: Mapping[str, float]) -> List[str]:
+        """Columns the detector needs that `row` (e.g. the first row of a thermo block) lacks."""
+
+        return [c for c in ["Step", *self.columns] if c not in row]
+
+    def update(self, row: Mapping[str, float]) -> Optional[int]:
+        if self.lifetime is not None:
+            return self.lifetime
+        if all(row[c] < thr for c, thr in zip(self.columns, self.thresholds)):
+            if self._streak == 0:
+                self._streak_start = int(row["Step"])
+            self._streak += 1
+            if self._streak >= self.patience:
+                self.lifetime = self._streak_start
+        else:
+            self._streak = 0
+        return self.lifetime
+
+
 def summarise_replicate(df: pd.DataFrame, biomass_col: str = "biomass", time_col: str = "time") -> Mapping[str, float]:
     """Example aggregation over a single replicate's time series.
 
@@ -32,3 +106,83 @@ def summarise_replicate(df: pd.DataFrame, biomass_col: str = "biomass", time_col
         "collapse_time": collapse_time,
         "max_biomass": float(df[biomass_col].max()),
     }
+
+
+def summarise_thermo(
+    df: pd.DataFrame,
+    species: Sequence[str] = ("v_ncross1", "v_ncross2"),
+    thresholds: Sequence[float] = (50.0,),
+) -> Mapping[str, float]:
+    """Per-run summary of a thermo table as returned by `io_nufeb.read_thermo`.
+
+    `collapse_step` is the first step at which all `species` are below their
+    thresholds (None if they never are); the last row's value of every
+    ``v_*`` column is reported as ``final_<name>``.
+    """
+
+    if df.empty:
+        return {"n_steps": 0, "last_step": None, "collapse_step": None}
+
+    summary = {
+        "n_steps": int(len(df)),
+        "last_step": int(df["Step"].iat[-1]),
+        "collapse_step": first_step_below(df["Step"], [df[c] for c in species], thresholds),
+    }
+    for col in df.columns:
+        if col.startswith("v_"):
+            summary[f"final_{col}"] = df[col].iat[-1].item()
+    return summary
+
+
+def lifetime_from_dumps(
+    directory: Path,
+    types: Sequence[int] = CROSS_TYPES,
+    thresholds: Sequence[float] = (50.0,),
+    pattern: str = "dump*.vtu",
+    bisect: bool = True,
+) -> Optional[int]:
+    """`first_step_below` on per-type counts taken from a ``dump*.vtu`` series.
+
+    Fallback for runs whose log is missing, truncated or garbled. Counts
+    come from ``np.bincount`` on each dump's ``type`` array, so the result
+    is the lifetime a log would give at dump resolution: the first dump
+    step at which every type in `types` is below its threshold.
+
+    With `bisect`, collapse after the first dump is taken to be absorbing
+    (once below, the populations stay below) and only O(log n) dumps are
+    read: the first and the last, then a binary search for the first
+    crossing. Runs that start below the thresholds and recover (e.g.
+    ``cross_ch3.log``) give the first dump's step, like the log does.
+    ``bisect=False`` scans every dump.
+    """
+
+    if len(thresholds) == 1:
+        thresholds = list(thresholds) * len(types)
+    if len(thresholds) != len(types):
+        raise ValueError(f"got {len(thresholds)} thresholds for {len(types)} types")
+
+    series = vtu_series(directory, pattern)
+    cache: Dict[int, bool] = {}
+
+    def below(k: int) -> bool:
+        if k not in cache:
+            counts = vtu_type_counts(series[k][1], minlength=max(types) + 1)
+            cache[k] = all(counts[t] < thr for t, thr in zip(types, thresholds))
+        return cache[k]
+
+    if not bisect:
+        return next((step for k, (step, _) in enumerate(series) if below(k)), None)
+    if not series:
+        return None
+    if below(0):
+        return series[0][0]
+    if not below(len(series) - 1):
+        return None
+    lo, hi = 1, len(series) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if below(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return series[lo][0]
@@ -0,0 +1,227 @@
+"""Parse a NUFEB input script once and render many variants of it.
+
+The script is split into commands (``&`` continuations joined, comments
+dropped), keeping the position of every argument in the original text.
+A value in the script is addressed as:
+
+* ``<fix-id>.<keyword>``: the value after a keyword of a fix, e.g.
+  ``growth_cross1.epsyield`` or ``coeff_sub.ratio``
+* ``<fix-id>[<i>]``: the i-th argument after the fix style, e.g.
+  ``diff_sub[1]`` (diffusion coefficient) or ``eps1[2]`` (EPS ratio)
+* ``<fix-id>.seed``: the seed of a division or EPS-secretion fix
+* ``variable.<name>``, ``grid.<substrate>`` (initial concentration),
+  ``run`` and ``timestep``
+
+`NufebScript.compile` turns a set of addresses into a `Template`, a
+single %-format string; rendering a variant is then one string
+formatting call, with comments and layout of the original kept.
+"""
+
+from __future__ import annotations
+
+import numbers
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Union
+
+SEEDED_STYLES = ("nufeb/division/coccus", "nufeb/eps_secretion")
+INPUT_COMMANDS = ("read_data", "read_restart", "include")
+
+# (v, offset) of the replicate seed formula used by the input generators:
+# seed = i^2 * v^2 + 2 * v + offset for replicate i.
+LABELS = {
+    "div1": (1, 101),
+    "div2": (2, 102),
+    "div3": (3, 103),
+    "eps1": (4, 104),
+    "eps2": (5, 105),
+    "eps3": (6, 106),
+}
+
+_TOKEN = re.compile(r"""(?P<quoted>"[^"]*"|'[^']*')|(?P<comment>#.*)|(?P<word>[^\s"'#]+)""")
+_INDEXED = re.compile(r"^(?P<fix>[^\[\]]+)\[(?P<index>-?\d+)\]$")
+_NUMBER = re.compile(r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+
+
+def seed_for(label: str, i: int) -> int:
+    v, offset = LABELS[label]
+    return i * i * (v * v) + 2 * v + offset
+
+
+@dataclass(frozen=True)
+class Token:
+    text: str
+    start: int
+    end: int
+
+
+@dataclass
+class Command:
+    """One input-script command; `args` excludes the command name."""
+
+    name: str
+    args: List[Token]
+    line: int
+
+    def words(self) -> List[str]:
+        return [t.text for t in self.args]
+
+
+def _parse(text: str) -> Iterator[Command]:
+    tokens: List[Token] = []
+    first_line = 1
+    offset = 0
+    for lineno, line in enumerate(text.splitlines(keepends=True), 1):
+        if not tokens:
+            first_line = lineno
+        for m in _TOKEN.finditer(line):
+            if m.lastgroup == "comment":
+                break
+            tokens.append(Token(m.group(), offset + m.start(), offset + m.end()))
+        offset += len(line)
+        if tokens and tokens[-1].text == "&":
+            tokens.pop()
+            continue
+        if tokens:
+            yield Command(tokens[0].text, tokens[1:], first_line)
+            tokens = []
+    if tokens:
+        yield Command(tokens[0].text, tokens[1:], first_line)
+
+
+class NufebScript:
+    """A parsed NUFEB input script; see the module docstring for addresses."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.commands = list(_parse(text))
+        self.fixes: Dict[str, Command] = {
+            c.args[0].text: c for c in self.commands if c.name == "fix" and len(c.args) >= 3
+        }
+
+    @classmethod
+    def read(cls, path: Path) -> "NufebScript":
+        return cls(Path(path).read_text(encoding="utf-8"))
+
+    def fix_args(self, fix_id: str) -> List[Token]:
+        """Arguments of fix `fix_id` after its style."""
+
+        try:
+            return self.fixes[fix_id].args[3:]
+        except KeyError:
+            raise KeyError(f"no fix {fix_id!r} in the script") from None
+
+    def seeded_fixes(self) -> List[str]:
+        return [f for f, c in self.fixes.items() if c.args[2].text in SEEDED_STYLES]
+
+    def input_files(self) -> List[str]:
+        """Files read by the script (``read_data``, ``read_restart``, ``include``), as written in it."""
+
+        return [c.args[0].text.strip("\"'") for c in self.commands if c.name in INPUT_COMMANDS and c.args]
+
+    def _last(self, name: str) -> Command:
+        matches = [c for c in self.commands if c.name == name and c.args]
+        if not matches:
+            raise KeyError(f"no {name!r} command in the script")
+        return matches[-1]
+
+    def slot(self, address: str) -> Token:
+        """The token of the script that `address` refers to."""
+
+        if address in ("run", "timestep"):
+            return self._last(address).args[0]
+        m = _INDEXED.match(address)
+        if m:
+            args = self.fix_args(m.group("fix"))
+            try:
+                return args[int(m.group("index"))]
+            except IndexError:
+                raise KeyError(f"fix {m.group('fix')!r} has only {len(args)} arguments") from None
+        scope, _, key = address.partition(".")
+        if not key:
+            raise KeyError(f"bad address {address!r}")
+        if scope == "variable":
+            for c in self.commands:
+                if c.name == "variable" and len(c.args) >= 3 and c.args[0].text == key:
+                    return c.args[2]
+            raise KeyError(f"no variable {key!r} in the script")
+        if scope == "grid":
+            for c in self.commands:
+                if c.name == "grid_modify" and len(c.args) >= 3 and c.args[0].text == "set" and c.args[1].text == key:
+                    return c.args[-1]
+            raise KeyError(f"no grid_modify set for {key!r} in the script")
+        args = self.fix_args(scope)
+        if key == "seed" and scope in self.seeded_fixes():
+            return args[-1]
+        for kw, value in zip(args, args[1:]):
+            if kw.text == key and _NUMBER.match(value.text):
+                return value
+        raise KeyError(f"fix {scope!r} has no keyword {key!r}")
+
+    def compile(self, fields: Mapping[str, Union[str, Sequence[str]]]) -> "Template":
+        """`Template` with each field of `fields` bound to one or more addresses."""
+
+        holes = []
+        for name, addresses in fields.items():
+            for address in [addresses] if isinstance(addresses, str) else addresses:
+                holes.append((self.slot(address), name))
+        holes.sort(key=lambda h: h[0].start)
+        for (a, na), (b, nb) in zip(holes, holes[1:]):
+            if a.start == b.start:
+                raise ValueError(f"fields {na!r} and {nb!r} address the same value (line text {a.text!r})")
+
+        parts = []
+        pos = 0
+        for token, _ in holes:
+            parts.append(self.text[pos:token.start].replace("%", "%%"))
+            parts.append("%s")
+            pos = token.end
+        parts.append(self.text[pos:].replace("%", "%%"))
+        defaults = {}
+        for token, name in holes:
+            defaults.setdefault(name, token.text)
+        return Template("".join(parts), [name for _, name in holes], defaults)
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    return f"{float(value):.8g}"
+
+
+@dataclass
+class Template:
+    """A compiled script: `fmt` with one ``%s`` per bound value."""
+
+    fmt: str
+    holes: List[str]
+    defaults: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.defaults)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """The script with `values` filled in; unset fields keep the template's value."""
+
+        text = {k: format_value(v) for k, v in values.items()}
+        return self.fmt % tuple(text.get(name, self.defaults[name]) for name in self.holes)
+
+    def render_many(self, rows: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+        for row in rows:
+            yield self.render(row)
+
+
+def replicate_seeds(script: NufebScript, i: int) -> Dict[str, int]:
+    """Seeds of replicate `i` for every seeded fix listed in `LABELS`, keyed by address."""
+
+    return {f"{fix}.seed": seed_for(fix, i) for fix in script.seeded_fixes() if fix in LABELS}
+
+
+def seed_fields(script: NufebScript) -> Dict[str, str]:
+    """`compile` fields that expose the seed of every seeded fix under its address."""
+
+    return {address: address for address in (f"{fix}.seed" for fix in script.seeded_fixes() if fix in LABELS)}
@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+import yaml
 
 
 @dataclass
@@ -12,6 +17,24 @@ class UniformParam:
     low: float
     high: float
 
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, n)
+
+
+@dataclass
+class LogUniformParam:
+    name: str
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return np.exp(rng.uniform(np.log(self.low), np.log(self.high), n))
+
+
+Param = Union[UniformParam, LogUniformParam]
+
+DISTRIBUTIONS = {"uniform": UniformParam, "loguniform": LogUniformParam}
+
 
 def default_parameter_space() -> Dict[str, UniformParam]:
     """Return a toy parameter space to be customised."""
@@ -20,3 +43,34 @@ def default_parameter_space() -> Dict[str, UniformParam]:
         "eps_yield_cooperator": UniformParam("eps_yield_cooperator", 0.0, 0.4),
         "eps_yield_cheater": UniformParam("eps_yield_cheater", 0.0, 0.2),
     }
+
+
+def load_config(path: Path) -> dict:
+    with Path(path).open() as f:
+        return yaml.safe_load(f)
+
+
+def parameter_space(config: dict) -> Dict[str, Param]:
+    """Parameter space from the ``parameters`` section of a sweep config (see configs/params_example.yaml)."""
+
+    space = {}
+    for name, spec in config.get("parameters", {}).items():
+        kind = spec.get("distribution", "uniform")
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"{name}: unknown distribution {kind!r}")
+        space[name] = DISTRIBUTIONS[kind](name, float(spec["min"]), float(spec["max"]))
+    return space
+
+
+def sample_parameters(space: Dict[str, Param], n: int, seed: Optional[int] = None) -> pd.DataFrame:
+    """`n` independent random draws of every parameter, one row per sample.
+
+    Every sample has its own generator spawned from `seed`, so sample k
+    gets the same values whatever `n` is and growing a sweep only adds rows.
+    """
+
+    rows = []
+    for child in np.random.SeedSequence(seed).spawn(n):
+        rng = np.random.default_rng(child)
+        rows.append({name: p.sample(rng, 1)[0] for name, p in space.items()})
+    return pd.DataFrame.from_records(rows, columns=list(space))
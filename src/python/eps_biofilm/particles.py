@@ -0,0 +1,181 @@
+"""Structure-of-arrays container for one frame of NUFEB particles.
+
+Type codes follow the groups of ``inputscript_EPS.nufeb``::
+
+    group CROSS1 type 1 / CROSS2 type 2 / CHEATER type 3 / dead type 4 / EPS type 5
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Dict, Iterator, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+CROSS1, CROSS2, CHEATER, DEAD, EPS = 1, 2, 3, 4, 5
+CROSS_TYPES = (CROSS1, CROSS2)
+LIVE_TYPES = (CROSS1, CROSS2, CHEATER)
+TYPE_NAMES = {CROSS1: "cross1", CROSS2: "cross2", CHEATER: "cheater", DEAD: "dead", EPS: "eps"}
+
+COLUMNS = ("id", "type", "diameter", "x", "y", "z")
+
+
+class ParticleFrame:
+    """Particles of one frame as contiguous NumPy columns.
+
+    Columns are ``id``, ``type`` (int), ``diameter``, ``x``, ``y``, ``z``
+    (float64, or float32 with ``float32=True``); any other per-particle
+    arrays are kept in `extra`. Columns are read with ``frame["x"]`` or as
+    attributes, so the frame can be passed wherever a dict of arrays is
+    expected. Indexing with a slice, an index array or a boolean mask
+    returns a new frame. Per-type index arrays are computed once, with a
+    single stable argsort, and cached.
+    """
+
+    def __init__(
+        self,
+        id: np.ndarray,
+        type: np.ndarray,
+        diameter: np.ndarray,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray,
+        extra: Optional[Mapping[str, np.ndarray]] = None,
+        float32: bool = False,
+    ) -> None:
+        fdtype = np.float32 if float32 else np.float64
+        self.id = np.ascontiguousarray(id)
+        self.type = np.ascontiguousarray(type)
+        self.diameter = np.ascontiguousarray(diameter, dtype=fdtype)
+        self.x = np.ascontiguousarray(x, dtype=fdtype)
+        self.y = np.ascontiguousarray(y, dtype=fdtype)
+        self.z = np.ascontiguousarray(z, dtype=fdtype)
+        self.extra: Dict[str, np.ndarray] = dict(extra or {})
+        n = len(self.id)
+        for name in COLUMNS[1:]:
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"column {name!r} has {len(getattr(self, name))} rows, expected {n}")
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray], float32: bool = False) -> "ParticleFrame":
+        """Build from a dict of columns; ``id`` defaults to ``1..N`` and unknown keys go to `extra`."""
+
+        n = len(arrays["x"])
+        ids = arrays["id"] if "id" in arrays else np.arange(1, n + 1)
+        extra = {k: v for k, v in arrays.items() if k not in COLUMNS}
+        return cls(ids, arrays["type"], arrays["diameter"], arrays["x"], arrays["y"], arrays["z"], extra, float32)
+
+    # -- container protocol ------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{TYPE_NAMES.get(t, t)}={c}" for t, c in self.type_counts().items() if c)
+        return f"ParticleFrame(n={len(self)}, {counts}, dtype={self.x.dtype})"
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key in COLUMNS:
+                return getattr(self, key)
+            return self.extra[key]
+        return self.take(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in COLUMNS or key in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def keys(self) -> Iterator[str]:
+        yield from COLUMNS
+        yield from self.extra
+
+    @property
+    def float32(self) -> bool:
+        return self.x.dtype == np.float32
+
+    def take(self, index) -> "ParticleFrame":
+        """Sub-frame of the particles selected by a slice, index array or boolean mask."""
+
+        extra = {k: v[index] for k, v in self.extra.items()}
+        return ParticleFrame(
+            self.id[index], self.type[index], self.diameter[index],
+            self.x[index], self.y[index], self.z[index], extra, self.float32,
+        )
+
+    def astype(self, float32: bool) -> "ParticleFrame":
+        """The same particles with float columns in float32 or float64 (no copy if unchanged)."""
+
+        if float32 == self.float32:
+            return self
+        return ParticleFrame(self.id, self.type, self.diameter, self.x, self.y, self.z, self.extra, float32)
+
+    # -- derived arrays ----------------------------------------------------
+
+    @cached_property
+    def positions(self) -> np.ndarray:
+        """``N x 3`` positions (built once, then cached)."""
+
+        return np.column_stack([self.x, self.y, self.z])
+
+    @cached_property
+    def _type_groups(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        order = np.argsort(self.type, kind="stable")
+        codes, starts = np.unique(self.type[order], return_index=True)
+        return order, codes, np.append(starts, len(order))
+
+    def indices(self, *types: int) -> np.ndarray:
+        """Sorted positions of the particles of the given type codes."""
+
+        order, codes, bounds = self._type_groups
+        parts = []
+        for t in types:
+            k = np.searchsorted(codes, t)
+            if k < len(codes) and codes[k] == t:
+                parts.append(order[bounds[k]:bounds[k + 1]])
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+    def of_type(self, *types: int) -> "ParticleFrame":
+        """Sub-frame of the particles of the given type codes."""
+
+        return self.take(self.indices(*types))
+
+    def type_counts(self) -> Dict[int, int]:
+        _, codes, bounds = self._type_groups
+        return {int(c): int(n) for c, n in zip(codes, np.diff(bounds))}
+
+    @property
+    def cross1(self) -> "ParticleFrame":
+        return self.of_type(CROSS1)
+
+    @property
+    def cross2(self) -> "ParticleFrame":
+        return self.of_type(CROSS2)
+
+    @property
+    def cheater(self) -> "ParticleFrame":
+        return self.of_type(CHEATER)
+
+    @property
+    def dead(self) -> "ParticleFrame":
+        return self.of_type(DEAD)
+
+    @property
+    def eps(self) -> "ParticleFrame":
+        return self.of_type(EPS)
+
+    @property
+    def live(self) -> "ParticleFrame":
+        return self.of_type(*LIVE_TYPES)
+
+    def volume(self) -> np.ndarray:
+        """Sphere volume of every particle."""
+
+        return np.pi / 6.0 * self.diameter.astype(np.float64) ** 3
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({name: self[name] for name in self.keys()})
@@ -0,0 +1,82 @@
+"""Performance accounting for NUFEB runs (loop time, load imbalance, cost)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .io_nufeb import PARSER_VERSION, read_thermo, read_timing
+from .manifest import Manifest, map_files
+
+TIMING_SECTIONS = ("pair", "neigh", "comm", "output", "modify", "other")
+
+
+def run_performance(path: Path) -> List[Dict[str, float]]:
+    """Per-run performance records for one log.
+
+    Combines `io_nufeb.read_timing` with the thermo table of the same run.
+    Added fields:
+
+    * ``atom_steps``: sum of the ``Atoms`` column over the run's thermo rows
+    * ``core_seconds``: ``loop_time * procs``
+    * ``cost_per_atom_step``: core-seconds per atom-step
+    * ``step_cpu_mean`` / ``step_cpu_max``: wall seconds per step, from the
+      ``CPU`` thermo column
+    * ``<section>_imbalance``: ``(max - avg) / avg`` per timing section
+    * ``imbalance``: fraction of the loop time spent waiting on the slowest
+      rank, ``sum(max - avg) / loop_time`` over all sections
+    """
+
+    timing = read_timing(path)
+    if timing.empty:
+        return []
+    thermo = read_thermo(path)
+
+    records = []
+    for rec in timing.to_dict("records"):
+        block = thermo[thermo["run"] == rec["run"]] if "run" in thermo else thermo.iloc[:0]
+        if "Atoms" in block and len(block):
+            # The thermo row at step 0 is the state before the first step.
+            rec["atom_steps"] = float(block["Atoms"].to_numpy()[1:].sum())
+        else:
+            rec["atom_steps"] = float(rec["atoms"] * rec["steps"])
+        if "CPU" in block and len(block) > 1:
+            dt = np.diff(block["CPU"].to_numpy(dtype=np.float64))
+            rec["step_cpu_mean"] = float(dt.mean())
+            rec["step_cpu_max"] = float(dt.max())
+
+        rec["core_seconds"] = rec["loop_time"] * rec["procs"]
+        rec["cost_per_atom_step"] = rec["core_seconds"] / rec["atom_steps"] if rec["atom_steps"] else float("nan")
+
+        wait = 0.0
+        for section in TIMING_SECTIONS:
+            avg, mx = rec.get(f"{section}_avg", np.nan), rec.get(f"{section}_max", np.nan)
+            if np.isfinite(avg) and np.isfinite(mx):
+                rec[f"{section}_imbalance"] = (mx - avg) / avg if avg > 0 else float("nan")
+                wait += mx - avg
+        rec["imbalance"] = wait / rec["loop_time"] if rec["loop_time"] > 0 else float("nan")
+        records.append(rec)
+    return records
+
+
+def performance_table(paths: List[Path], jobs: int = 1, manifest: Optional[Manifest] = None) -> pd.DataFrame:
+    """Stack `run_performance` for many logs into one table with a ``file`` column.
+
+    Logs are spread over `jobs` processes; with a `manifest`, logs already
+    analysed are not parsed again.
+    """
+
+    kind = f"performance:v{PARSER_VERSION}"
+    per_log = map_files(run_performance, paths, jobs=jobs, manifest=manifest, kind=kind)
+    rows = [{"file": str(p), **rec} for p, recs in zip(paths, per_log) for rec in recs]
+    return pd.DataFrame.from_records(rows)
+
+
+def rank_runs(perf: pd.DataFrame, by: str = "imbalance", top: int | None = 10) -> pd.DataFrame:
+    """Return the `top` runs with the largest `by` (e.g. ``imbalance``, ``cost_per_atom_step``)."""
+
+    ranked = perf.sort_values(by, ascending=False, na_position="last")
+    return ranked if top is None else ranked.head(top)
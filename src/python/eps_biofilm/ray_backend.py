@@ -0,0 +1,110 @@
+"""Ray backend for parameter sweeps.
+
+Every simulation is a Ray task that reserves as many CPUs as it has MPI
+ranks, so Ray never starts more ranks on a node than it has cores. When
+a simulation finishes, its log is summarised by a dependent task pinned
+to the node that ran it, so only the summary travels back to the driver.
+Summaries are yielded as runs finish.
+
+``ray.init()`` without an address starts a local Ray instance; with
+``RAY_ADDRESS`` set (or `address` passed) the same code runs on a
+multi-node cluster. Run commands and directories must then be valid on
+every node (e.g. a shared filesystem).
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import ray
+from ray.util.scheduling_strategies import NodeAffinitySchedulingStrategy
+
+from .io_nufeb import read_thermo
+from .metrics import summarise_thermo
+from .sweep import SweepState
+
+# job name -> (command, working directory, log file relative to it)
+RayJobs = Mapping[str, Tuple[List[str], str, str]]
+
+
+@ray.remote
+def _simulate(job: str, cmd: List[str], cwd: str, log: str) -> Dict[str, Any]:
+    returncode = subprocess.call(cmd, cwd=cwd, env={**os.environ, "OMP_NUM_THREADS": "1"})
+    return {
+        "job": job,
+        "returncode": returncode,
+        "node_id": ray.get_runtime_context().get_node_id(),
+        "log": str(Path(cwd) / log),
+    }
+
+
+@ray.remote(num_cpus=1)
+def _analyse(run: Dict[str, Any], species: Sequence[str], thresholds: Sequence[float]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"job": run["job"], "returncode": run["returncode"]}
+    if Path(run["log"]).exists():
+        summary.update(summarise_thermo(read_thermo(Path(run["log"])), species, thresholds))
+    return summary
+
+
+def run_ray(
+    jobs: RayJobs,
+    ranks: int,
+    state: SweepState,
+    species: Sequence[str] = ("v_ncross1", "v_ncross2"),
+    thresholds: Sequence[float] = (50.0,),
+    address: Optional[str] = None,
+    keys: Optional[Mapping[str, str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Run every job not yet finished in `state` on Ray and yield log summaries as runs finish.
+
+    Each summary holds ``job``, ``returncode`` and the fields of
+    `metrics.summarise_thermo`. Start and finish events are appended to
+    `state` like in `sweep.run_local`, which also explains `keys`; once a
+    log is summarised, the finish event is repeated with the ``summary``.
+    Jobs finished by an earlier call are yielded too, from that event, or
+    else summarised again on the node that ran them. Logs are never read
+    on the driver.
+    """
+
+    if not ray.is_initialized():
+        ray.init(address=address)
+
+    done = set(state.done(keys))
+    keyed = (lambda job: {"key": keys[job]}) if keys is not None else (lambda job: {})
+    simulations = {}
+    pending = []
+    for job, (cmd, cwd, log) in jobs.items():
+        if job in done:
+            event = state.last[job]
+            if "summary" in event:
+                yield event["summary"]
+            else:
+                run = {"job": job, "returncode": 0, "log": str(Path(cwd) / log)}
+                # the node may have left the cluster since; the log is then reported missing
+                on_node = NodeAffinitySchedulingStrategy(node_id=event.get("node_id"), soft=True)
+                ref = _analyse.options(scheduling_strategy=on_node).remote(run, tuple(species), tuple(thresholds))
+                pending.append(ref)
+            continue
+        ref = _simulate.options(num_cpus=ranks).remote(job, cmd, cwd, log)
+        simulations[ref] = job
+        state.log(job, "submitted", ranks=ranks, **keyed(job))
+
+    pending += list(simulations)
+    while pending:
+        (ref,), pending = ray.wait(pending, num_returns=1)
+        if ref not in simulations:
+            summary = ray.get(ref)
+            if "n_steps" in summary:  # not when the log was missing on that node
+                event = state.last[summary["job"]]
+                fields = {k: v for k, v in event.items() if k not in ("job", "status", "time", "summary")}
+                state.log(summary["job"], event["status"], **fields, summary=summary)
+            yield summary
+            continue
+        run = ray.get(ref)
+        status = "finished" if run["returncode"] == 0 else "failed"
+        state.log(run["job"], status, returncode=run["returncode"], node_id=run["node_id"], **keyed(run["job"]))
+        on_node = NodeAffinitySchedulingStrategy(node_id=run["node_id"], soft=False)
+        pending.append(_analyse.options(scheduling_strategy=on_node).remote(run, tuple(species), tuple(thresholds)))
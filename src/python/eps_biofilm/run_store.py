@@ -0,0 +1,117 @@
+"""Content-addressed store of finished NUFEB runs.
+
+A run is keyed on the bytes of its rendered input script, the files the
+script reads (``read_data``, ``read_restart``, ``include``), the
+contents of the NUFEB binary and any launcher settings that change the
+outputs (e.g. the MPI rank count and the early-stop rule). Runs are staged in a scratch
+directory and moved to ``<root>/runs/<key[:2]>/<key>/`` only when they
+finish, so a key that exists is always a complete run and a crashed run
+is simply re-done.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Mapping, Optional
+
+from .manifest import Manifest, file_digest
+from .nufeb_template import NufebScript
+
+RECORD_NAME = "run.json"
+SCRIPT_NAME = "in.nufeb"
+
+
+def binary_path(binary: str) -> Path:
+    found = shutil.which(binary)
+    if found is None:
+        raise FileNotFoundError(f"NUFEB binary {binary!r} not found on PATH")
+    return Path(found).resolve()
+
+
+def run_key(
+    script_path: Path,
+    binary: str,
+    extra: Optional[Mapping[str, Any]] = None,
+    manifest: Optional[Manifest] = None,
+) -> str:
+    """Hex key identifying the outputs of running `script_path` with `binary`.
+
+    `extra` holds launcher settings that affect the outputs; it must be
+    JSON-serialisable. With a `manifest`, file hashes (notably of the
+    binary) are reused while size and mtime are unchanged.
+    """
+
+    digest = manifest.digest if manifest is not None else file_digest
+    script_path = Path(script_path)
+    files = NufebScript.read(script_path).input_files()
+    parts = {
+        "script": file_digest(script_path),
+        "files": {name: digest(script_path.parent / name) for name in files},
+        "binary": digest(binary_path(binary)),
+        "extra": dict(extra or {}),
+    }
+    blob = json.dumps(parts, sort_keys=True).encode()
+    return hashlib.blake2b(blob, digest_size=20).hexdigest()
+
+
+class RunStore:
+    """Finished runs under ``<root>/runs``, staged under ``<root>/tmp``."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        (self.root / "runs").mkdir(parents=True, exist_ok=True)
+        (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.root / "runs" / key[:2] / key
+
+    def has(self, key: str) -> bool:
+        return (self.path(key) / RECORD_NAME).exists()
+
+    def record(self, key: str) -> Dict[str, Any]:
+        return json.loads((self.path(key) / RECORD_NAME).read_text(encoding="utf-8"))
+
+    def stage(self, key: str, script_path: Path) -> Path:
+        """Scratch run directory holding the script (as ``in.nufeb``) and the files it reads.
+
+        Relative input files keep their names so the script runs unchanged
+        with the scratch directory as working directory.
+        """
+
+        script_path = Path(script_path)
+        work = self.root / "tmp" / f"{key}.{os.getpid()}"
+        if work.exists():
+            shutil.rmtree(work)
+        work.mkdir(parents=True)
+        shutil.copy2(script_path, work / SCRIPT_NAME)
+        for name in NufebScript.read(script_path).input_files():
+            rel = PurePosixPath(name)
+            if rel.is_absolute() or ".." in rel.parts:
+                continue
+            (work / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(script_path.parent / rel, work / rel)
+        return work
+
+    def commit(self, key: str, work: Path, record: Mapping[str, Any]) -> Path:
+        """Move a finished scratch directory to its key and write its record."""
+
+        record = {"key": key, "finished": time.strftime("%Y-%m-%dT%H:%M:%S"), **record}
+        (Path(work) / RECORD_NAME).write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+        dest = self.path(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(work, dest)
+        except OSError:
+            # another launcher finished the same key first; keep its copy
+            if not self.has(key):
+                raise
+            shutil.rmtree(work)
+        return dest
+
+    def discard(self, work: Path) -> None:
+        shutil.rmtree(work, ignore_errors=True)
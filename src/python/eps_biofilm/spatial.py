@@ -0,0 +1,234 @@
+"""Neighbour-based spatial structure metrics for particle frames.
+
+Frames are `particles.ParticleFrame` objects, e.g. from
+`io_nufeb.read_vtu`.
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from .io_nufeb import PARSER_VERSION, read_vtu, vtu_series
+from .manifest import Manifest, map_files
+from .particles import CHEATER, CROSS1, CROSS2, CROSS_TYPES, EPS, LIVE_TYPES, ParticleFrame
+
+
+def _positions(frame: ParticleFrame) -> np.ndarray:
+    return frame.positions.astype(np.float64, copy=False)
+
+
+def neighbour_pairs(pos: np.ndarray, r: float, box: Optional[Sequence[float]] = None) -> np.ndarray:
+    """``(M, 2)`` index pairs ``i < j`` closer than `r`.
+
+    `box` gives the periodic lengths in x and y (``boundary pp pp ff``);
+    z is never wrapped.
+    """
+
+    if len(pos) < 2:
+        return np.empty((0, 2), dtype=np.intp)
+    if box is None:
+        return cKDTree(pos).query_pairs(r, output_type="ndarray")
+
+    wrapped = pos.copy()
+    wrapped[:, :2] %= np.asarray(box, dtype=np.float64)
+    wrapped[:, 2] -= wrapped[:, 2].min()
+    # A z "period" longer than the column plus the cutoff never wraps.
+    boxsize = [box[0], box[1], wrapped[:, 2].max() + 2 * r + 1.0]
+    return cKDTree(wrapped, boxsize=boxsize).query_pairs(r, output_type="ndarray")
+
+
+def _count_within(
+    points: np.ndarray, centres: np.ndarray, r: float, box: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """Number of `points` within `r` of each of `centres`, without materialising the pairs."""
+
+    if len(points) == 0 or len(centres) == 0:
+        return np.zeros(len(centres), dtype=np.intp)
+    if box is None:
+        return cKDTree(points).query_ball_point(centres, r, return_length=True)
+
+    L = np.asarray(box, dtype=np.float64)
+    points, centres = points.copy(), centres.copy()
+    points[:, :2] %= L
+    centres[:, :2] %= L
+    z0 = min(points[:, 2].min(), centres[:, 2].min())
+    points[:, 2] -= z0
+    centres[:, 2] -= z0
+    boxsize = [box[0], box[1], max(points[:, 2].max(), centres[:, 2].max()) + 2 * r + 1.0]
+    return cKDTree(points, boxsize=boxsize).query_ball_point(centres, r, return_length=True)
+
+
+def _separation(pos: np.ndarray, pairs: np.ndarray, box: Optional[Sequence[float]]) -> np.ndarray:
+    delta = pos[pairs[:, 0]] - pos[pairs[:, 1]]
+    if box is not None:
+        L = np.asarray(box, dtype=np.float64)
+        delta[:, :2] -= L * np.round(delta[:, :2] / L)
+    return np.sqrt(np.einsum("ij,ij->i", delta, delta))
+
+
+def contact_pairs(
+    frame: ParticleFrame,
+    tol: float = 0.0,
+    box: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """Index pairs of touching spheres: centre distance <= sum of radii + `tol`."""
+
+    pos = _positions(frame)
+    diameter = frame.diameter.astype(np.float64, copy=False)
+    if len(pos) < 2:
+        return np.empty((0, 2), dtype=np.intp)
+    pairs = neighbour_pairs(pos, float(diameter.max()) + tol, box)
+    reach = 0.5 * (diameter[pairs[:, 0]] + diameter[pairs[:, 1]]) + tol
+    return pairs[_separation(pos, pairs, box) <= reach]
+
+
+def _ends(pairs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Both directions of every pair: ``(a, b)`` with each contact listed from each side."""
+
+    return np.concatenate([pairs[:, 0], pairs[:, 1]]), np.concatenate([pairs[:, 1], pairs[:, 0]])
+
+
+def _ratio(num: float, den: float) -> float:
+    return float(num) / float(den) if den else float("nan")
+
+
+def metric_sums(
+    frame: ParticleFrame,
+    tol: float = 0.0,
+    seg_radius: float = 5e-6,
+    box: Optional[Sequence[float]] = None,
+    owned: Optional[np.ndarray] = None,
+    gid: Optional[np.ndarray] = None,
+) -> Dict[str, float]:
+    """Additive counts behind `frame_metrics`.
+
+    For a piece of a decomposed frame, `owned` masks the particles this
+    piece is responsible for (the rest are ghosts) and `gid` gives
+    global particle numbers; a contact is counted by the piece owning
+    its lower-`gid` end, so sums over pieces equal the whole-frame sums.
+    """
+
+    types = frame.type
+    n = len(types)
+    if owned is None:
+        owned = np.ones(n, dtype=bool)
+    if gid is None:
+        gid = np.arange(n)
+    counts = np.bincount(types[owned], minlength=EPS + 1)
+    is_cross = np.isin(types, CROSS_TYPES)
+
+    all_pairs = contact_pairs(frame, tol, box)
+    first = np.where(gid[all_pairs[:, 0]] < gid[all_pairs[:, 1]], all_pairs[:, 0], all_pairs[:, 1])
+    pairs = all_pairs[owned[first]]
+    both_cross = is_cross[pairs[:, 0]] & is_cross[pairs[:, 1]]
+    hetero = both_cross & (types[pairs[:, 0]] != types[pairs[:, 1]])
+
+    # Per-particle sums need every contact of an owned particle, ghosts included.
+    a, b = _ends(all_pairs)
+    from_cross = is_cross[a] & owned[a]
+    mine = is_cross & owned
+    degree = np.bincount(a[from_cross], minlength=n)[mine]
+    eps_degree = np.bincount(a[from_cross & (types[b] == EPS)], minlength=n)[mine]
+    share = np.divide(eps_degree, degree, out=np.zeros(len(degree)), where=degree > 0)
+
+    pos = _positions(frame)
+    cross_pos = pos[np.flatnonzero(mine)]
+    n_live = _count_within(pos[frame.indices(*LIVE_TYPES)], cross_pos, seg_radius, box) - 1
+    n_cheat = _count_within(pos[frame.indices(CHEATER)], cross_pos, seg_radius, box)
+
+    return {
+        "n_atoms": int(owned.sum()),
+        "n_cross1": int(counts[CROSS1]),
+        "n_cross2": int(counts[CROSS2]),
+        "n_cheater": int(counts[CHEATER]),
+        "n_eps": int(counts[EPS]),
+        "n_live": int(counts[list(LIVE_TYPES)].sum()),
+        "n_contacts": int(len(pairs)),
+        "cross_cross_contacts": int(both_cross.sum()),
+        "cross12_contacts": int(hetero.sum()),
+        "cross_contact_ends": int(from_cross.sum()),
+        "cross_cheater_ends": int((from_cross & (types[b] == CHEATER)).sum()),
+        "eps_share_sum": float(share.sum()),
+        "eps_covered": int((eps_degree > 0).sum()),
+        "seg_live": int(n_live.sum()),
+        "seg_cheater": int(n_cheat.sum()),
+    }
+
+
+def finish_metrics(sums: Dict[str, float]) -> Dict[str, float]:
+    """Turn (possibly reduced) `metric_sums` into the `frame_metrics` record."""
+
+    n_cross = sums["n_cross1"] + sums["n_cross2"]
+    out: Dict[str, float] = {k: sums[k] for k in ("n_atoms", "n_cross1", "n_cross2", "n_cheater", "n_eps", "n_contacts")}
+    out["cross_contact_frac"] = _ratio(sums["cross12_contacts"], sums["cross_cross_contacts"])
+    out["cheater_contact_frac"] = _ratio(sums["cross_cheater_ends"], sums["cross_contact_ends"])
+    out["eps_coverage"] = _ratio(sums["eps_share_sum"], n_cross)
+    out["eps_covered_frac"] = _ratio(sums["eps_covered"], n_cross)
+    local = _ratio(sums["seg_cheater"], sums["seg_live"])
+    global_share = _ratio(sums["n_cheater"], sums["n_live"])
+    out["segregation"] = 1.0 - local / global_share if global_share and not np.isnan(local) else float("nan")
+    return out
+
+
+def frame_metrics(
+    frame: ParticleFrame,
+    tol: float = 0.0,
+    seg_radius: float = 5e-6,
+    box: Optional[Sequence[float]] = None,
+) -> Dict[str, float]:
+    """Contact and segregation metrics of one frame.
+
+    * ``cross_contact_frac``: share of cross-feeder/cross-feeder contacts
+      that are CROSS1-CROSS2
+    * ``cheater_contact_frac``: share of cross-feeder contacts whose
+      partner is a cheater
+    * ``eps_coverage``: mean share of each cross-feeder's contacts that
+      are EPS particles; ``eps_covered_frac``: share of cross-feeders
+      touching any EPS
+    * ``segregation``: ``1 - local / global`` cheater share, the local
+      share being the cheater fraction among live cells within
+      `seg_radius` of a cross-feeder (0 = well mixed, 1 = fully
+      segregated, negative = cheaters enriched around cross-feeders)
+    """
+
+    return finish_metrics(metric_sums(frame, tol, seg_radius, box))
+
+
+def file_metrics(
+    path: Path,
+    tol: float = 0.0,
+    seg_radius: float = 5e-6,
+    box: Optional[Sequence[float]] = None,
+) -> Dict[str, float]:
+    """`frame_metrics` of one dump file (picklable for process pools)."""
+
+    return frame_metrics(read_vtu(path), tol, seg_radius, box)
+
+
+def segregation_series(
+    directory: Path,
+    pattern: str = "dump*.vtu",
+    tol: float = 0.0,
+    seg_radius: float = 5e-6,
+    box: Optional[Sequence[float]] = None,
+    jobs: int = 1,
+    manifest: Optional[Manifest] = None,
+) -> pd.DataFrame:
+    """`frame_metrics` for every dump of a run, one row per step.
+
+    Frames are spread over `jobs` processes; with a `manifest`, frames
+    already analysed with the same parameters are not recomputed.
+    """
+
+    series = vtu_series(directory, pattern)
+    box = None if box is None else tuple(float(b) for b in box)
+    func = partial(file_metrics, tol=tol, seg_radius=seg_radius, box=box)
+    kind = f"segregation:v{PARSER_VERSION}:tol={tol}:r={seg_radius}:box={box}"
+    rows = map_files(func, [p for _, p in series], jobs=jobs, manifest=manifest, kind=kind)
+    return pd.DataFrame.from_records([{"step": step, **row} for (step, _), row in zip(series, rows)])
@@ -0,0 +1,264 @@
+"""Render and run parameter sweeps on one machine.
+
+`render_sweep` writes one input script per (parameter sample, seed
+replicate) from a sweep config. `run_local` runs a set of commands a few
+at a time, each pinned to its own group of cores, so that e.g. four
+16-rank runs share a 64-core node without oversubscribing it. Progress
+is appended to a JSON-lines `SweepState` file; re-running the sweep
+skips jobs that already finished successfully with the same input.
+
+Every rendered input has a content ``key`` (see `input_key`). A job only
+counts as done when it finished with the key of its current input; when
+a config change gives a finished job new values, its old input and log
+are moved to ``superseded/<old key>/`` and the job runs again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .manifest import file_digest
+from .nufeb_template import NufebScript, Template, replicate_seeds, seed_fields
+from .parameter_space import parameter_space, sample_parameters
+
+
+def _resolves(script: NufebScript, address: str) -> bool:
+    try:
+        script.slot(address)
+    except KeyError:
+        return False
+    return True
+
+
+def compile_sweep(
+    config: Mapping[str, Any], template_path: Path, partial: bool = False
+) -> Tuple[NufebScript, Template]:
+    """Parse `template_path` and bind the config's parameters and the replicate seeds.
+
+    Parameters are bound to the addresses under ``template.bind`` (see
+    `eps_biofilm.nufeb_template`). With `partial`, addresses the template
+    does not have are skipped, so that one ``bind`` section serves e.g.
+    both the EPS script and the NEPS script, which has no EPS fixes.
+    """
+
+    script = NufebScript.read(template_path)
+    space = parameter_space(config)
+    bind: Dict[str, List[str]] = {}
+    for name, addresses in config.get("template", {}).get("bind", {}).items():
+        if name not in space:
+            continue
+        addresses = [addresses] if isinstance(addresses, str) else list(addresses)
+        if partial:
+            addresses = [a for a in addresses if _resolves(script, a)]
+        if addresses:
+            bind[name] = addresses
+    return script, script.compile({**seed_fields(script), **bind})
+
+
+def write_inputs(
+    script: NufebScript,
+    template: Template,
+    template_path: Path,
+    rows: List[Dict[str, Any]],
+    out_dir: Path,
+    prefix: str = "inputscript_",
+    finished: Optional[Mapping[str, Optional[str]]] = None,
+) -> pd.DataFrame:
+    """Render one input per row of `rows` (``sample``, ``replicate``, values) into `out_dir`.
+
+    Each row gets an ``input`` column, the file name
+    ``<prefix>s<sample>_r<replicate>.nufeb``, and its ``key``. Files the
+    template reads (e.g. ``read_data atom_ch.in``) are copied next to the
+    inputs. `finished` maps inputs that already ran to the key they ran
+    with (`SweepState.finished_keys`); those whose key changes are moved
+    aside by `supersede` instead of being overwritten, and inputs whose
+    text is unchanged are left untouched.
+    """
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    data = {}
+    for name in script.input_files():
+        if not Path(name).is_absolute():
+            (out_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(Path(template_path).parent / name, out_dir / name)
+            data[name] = file_digest(out_dir / name)
+    finished = finished or {}
+    for row, text in zip(rows, template.render_many(rows)):
+        row["input"] = f"{prefix}s{row['sample']}_r{row['replicate']}.nufeb"
+        row["key"] = input_key(text, data)
+        path = out_dir / row["input"]
+        if row["input"] in finished and finished[row["input"]] != row["key"]:
+            supersede(path, finished[row["input"]])
+        if not path.exists() or path.read_text(encoding="utf-8") != text:
+            path.write_text(text, encoding="utf-8")
+    return pd.DataFrame.from_records(rows)
+
+
+def input_key(text: str, data: Mapping[str, str]) -> str:
+    """Hex key of a rendered input: its text and the digests of the files it reads."""
+
+    blob = json.dumps({"script": text, "files": dict(data)}, sort_keys=True).encode()
+    return hashlib.blake2b(blob, digest_size=20).hexdigest()
+
+
+def supersede(path: Path, key: Optional[str]) -> None:
+    """Move an input, its ``.log`` and the log's side files to ``superseded/<key>/`` next to it."""
+
+    path = Path(path)
+    dest = path.parent / "superseded" / (key or "unkeyed")
+    log = path.with_suffix(".log")
+    for p in [path, log, *path.parent.glob(log.name + ".*")]:
+        if p.exists() or p.is_symlink():
+            dest.mkdir(parents=True, exist_ok=True)
+            os.replace(p, dest / p.name)
+
+
+def render_sweep(
+    config: Mapping[str, Any],
+    template_path: Path,
+    out_dir: Path,
+    n_samples: int,
+    replicates: int = 1,
+    index_start: int = 1,
+    prefix: str = "inputscript_",
+    finished: Optional[Mapping[str, Optional[str]]] = None,
+) -> pd.DataFrame:
+    """Write the inputs of a sweep and return one row per input file.
+
+    Every sample of the config's ``parameters`` is written into the
+    template (see `compile_sweep`); every replicate gets its own
+    division / EPS seeds. Columns are ``sample``, ``replicate``, the
+    parameters, the seeds, ``input`` and ``key`` (see `write_inputs`,
+    which also explains `finished`). The table is also written to
+    ``samples.csv``.
+    """
+
+    script, template = compile_sweep(config, template_path)
+    samples = sample_parameters(parameter_space(config), n_samples, config.get("sampling", {}).get("seed"))
+    rows = []
+    for s, params in enumerate(samples.to_dict("records")):
+        for r in range(index_start, index_start + replicates):
+            rows.append({"sample": s, "replicate": r, **params, **replicate_seeds(script, r)})
+
+    table = write_inputs(script, template, template_path, rows, out_dir, prefix, finished)
+    table.to_csv(Path(out_dir) / "samples.csv", index=False)
+    return table
+
+
+def available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_groups(ranks: int, cores: Optional[int] = None) -> List[List[int]]:
+    """Disjoint groups of `ranks` CPUs out of the first `cores` CPUs this process may use."""
+
+    cpus = available_cpus()[:cores] if cores else available_cpus()
+    if ranks > len(cpus):
+        raise ValueError(f"{ranks} ranks per job but only {len(cpus)} cores available")
+    return [cpus[i:i + ranks] for i in range(0, len(cpus) - ranks + 1, ranks)]
+
+
+class SweepState:
+    """Append-only JSON-lines log of job events (``started``, ``finished``, ``failed``).
+
+    Events of keyed jobs carry the ``key`` of the input they ran.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.last: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    event = json.loads(line)
+                    self.last[event["job"]] = event
+
+    def done(self, keys: Optional[Mapping[str, str]] = None) -> List[str]:
+        """Jobs that finished; with `keys`, only those that finished with ``keys[job]``."""
+
+        return [
+            job for job, e in self.last.items()
+            if e["status"] == "finished" and (keys is None or e.get("key") == keys.get(job))
+        ]
+
+    def finished_keys(self) -> Dict[str, Optional[str]]:
+        return {job: e.get("key") for job, e in self.last.items() if e["status"] == "finished"}
+
+    def log(self, job: str, status: str, **fields: Any) -> Dict[str, Any]:
+        event = {"job": job, "status": status, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), **fields}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+        self.last[job] = event
+        return event
+
+
+def _pin(cpus: Sequence[int]) -> Callable[[], None]:
+    def pin() -> None:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+
+    return pin
+
+
+def run_local(
+    commands: Mapping[str, Union[List[str], Callable[[Any], List[str]]]],
+    groups: Sequence[Any],
+    state: SweepState,
+    cwd: Optional[Path] = None,
+    poll_interval: float = 1.0,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    pin: bool = True,
+    keys: Optional[Mapping[str, str]] = None,
+) -> Dict[str, int]:
+    """Run every command not yet finished in `state`, one per group at a time.
+
+    With `pin`, groups are lists of CPUs and each command is started with
+    its CPU affinity set to its group, which the MPI launcher and its
+    ranks inherit. A command may also be a callable that builds the argv
+    for the group it was given (e.g. a hostfile per group). Commands run
+    with ``OMP_NUM_THREADS=1``. With `keys`, a job is skipped only if it
+    finished with the same key, and its events record it. Returns the
+    exit code of every command that was run.
+    """
+
+    done = set(state.done(keys))
+    keyed = (lambda job: {"key": keys[job]}) if keys is not None else (lambda job: {})
+    pending = [job for job in commands if job not in done]
+    free = list(groups)
+    running: Dict[subprocess.Popen, tuple] = {}
+    codes: Dict[str, int] = {}
+    env = {**os.environ, "OMP_NUM_THREADS": "1"}
+    emit = on_event or (lambda event: None)
+
+    while pending or running:
+        while pending and free:
+            job, group = pending.pop(0), free.pop(0)
+            cmd = commands[job]
+            cmd = cmd(group) if callable(cmd) else cmd
+            proc = subprocess.Popen(cmd, cwd=cwd, env=env, preexec_fn=_pin(group) if pin else None)
+            running[proc] = (job, group, time.monotonic())
+            emit(state.log(job, "started", group=group, pid=proc.pid, **keyed(job)))
+
+        time.sleep(poll_interval)
+        for proc in [p for p in running if p.poll() is not None]:
+            job, group, t0 = running.pop(proc)
+            codes[job] = proc.returncode
+            status = "finished" if proc.returncode == 0 else "failed"
+            emit(state.log(
+                job, status, returncode=proc.returncode, seconds=round(time.monotonic() - t0, 1), **keyed(job)
+            ))
+            free.append(group)
+    return codes
@@ -0,0 +1,226 @@
+"""Task farming of many small NUFEB runs inside one batch allocation.
+
+The slots of the allocation (``$PBS_NODEFILE`` or the Slurm node list)
+are cut into fixed-size rank groups. Inputs are handed to whichever
+group is free next, so one 10-node job runs 10 concurrent 16-rank
+simulations and keeps going until the list is exhausted. The dispatch
+loop is `sweep.run_local`; the ``local`` mode runs the same farm on the
+core groups of `sweep.cpu_groups` with plain ``mpirun``.
+
+Independent ``mpirun``s on one node would each bind their ranks from
+the node's first cores and stack on them. Each group is therefore
+placed explicitly: with an Open MPI rankfile listing its own slots of
+every host, or, on this machine, by pinning the launcher to the group's
+CPUs with ``--bind-to none``.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shlex
+import subprocess
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+Hosts = List[Tuple[str, int]]
+
+PBS_SCRIPT = """#!/bin/bash
+
+#PBS -N {name}
+#PBS -l nodes={nodes}:ppn={ppn}
+#PBS -l walltime={walltime}
+#PBS -j oe
+#PBS -o {workdir}/{name}.out
+
+{modules}
+export OMP_NUM_THREADS=1
+export PYTHONPATH={pythonpath}${{PYTHONPATH:+:$PYTHONPATH}}
+
+cd {workdir}
+echo Farm start at `date` on $(sort -u $PBS_NODEFILE | tr '\\n' ' ')
+{python} {farm_script} run --scheduler pbs {args}
+echo Farm end at `date`
+"""
+
+SLURM_SCRIPT = """#!/bin/bash
+
+#SBATCH --job-name={name}
+#SBATCH --nodes={nodes}
+#SBATCH --ntasks-per-node={ppn}
+#SBATCH --time={walltime}
+#SBATCH --output={workdir}/{name}.out
+
+{modules}
+export OMP_NUM_THREADS=1
+export PYTHONPATH={pythonpath}${{PYTHONPATH:+:$PYTHONPATH}}
+
+cd {workdir}
+echo Farm start at `date` on $SLURM_JOB_NODELIST
+{python} {farm_script} run --scheduler slurm {args}
+echo Farm end at `date`
+"""
+
+JOB_SCRIPTS = {"pbs": PBS_SCRIPT, "slurm": SLURM_SCRIPT}
+
+
+def pbs_hosts(nodefile: Optional[Path] = None) -> Hosts:
+    """``(host, slots)`` from ``$PBS_NODEFILE``, which lists each host once per slot."""
+
+    path = Path(nodefile or os.environ["PBS_NODEFILE"])
+    names = [line.strip() for line in path.read_text().splitlines() if line.strip()]
+    return list(Counter(names).items())
+
+
+def _expand_tasks_per_node(spec: str) -> List[int]:
+    # "16(x2),8" -> [16, 16, 8]
+    out = []
+    for part in spec.split(","):
+        m = re.fullmatch(r"(\d+)(?:\(x(\d+)\))?", part.strip())
+        if m:
+            out += [int(m.group(1))] * int(m.group(2) or 1)
+    return out
+
+
+def slurm_hosts() -> Hosts:
+    """``(host, slots)`` of the current Slurm allocation."""
+
+    names = subprocess.run(
+        ["scontrol", "show", "hostnames", os.environ["SLURM_JOB_NODELIST"]],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    slots = _expand_tasks_per_node(os.environ.get("SLURM_TASKS_PER_NODE", ""))
+    if len(slots) != len(names):
+        slots = [int(os.environ.get("SLURM_CPUS_ON_NODE", 1))] * len(names)
+    return list(zip(names, slots))
+
+
+HOST_SOURCES: Dict[str, Callable[[], Hosts]] = {"pbs": pbs_hosts, "slurm": slurm_hosts}
+
+
+def rank_groups(hosts: Hosts, ranks: int) -> List[Hosts]:
+    """Cut the slots of `hosts` into groups of exactly `ranks` slots.
+
+    Slots are taken host by host, so a group only spans hosts when
+    `ranks` does not divide the slots per host; leftover slots are unused.
+    """
+
+    groups: List[Hosts] = []
+    current: Dict[str, int] = {}
+    need = ranks
+    for host, slots in hosts:
+        while slots:
+            take = min(slots, need)
+            current[host] = current.get(host, 0) + take
+            slots -= take
+            need -= take
+            if need == 0:
+                groups.append(list(current.items()))
+                current, need = {}, ranks
+    return groups
+
+
+def write_hostfiles(groups: Sequence[Hosts], directory: Path) -> List[str]:
+    """One Open MPI hostfile (``host slots=n``) per group; returns their paths."""
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for g, group in enumerate(groups):
+        path = directory / f"hosts.{g}"
+        path.write_text("".join(f"{host} slots={n}\n" for host, n in group))
+        paths.append(str(path.resolve()))
+    return paths
+
+
+def write_rankfiles(groups: Sequence[Hosts], directory: Path) -> List[str]:
+    """One Open MPI rankfile per group; returns their paths.
+
+    Groups sharing a host get disjoint slots of it (slot ``k`` is the
+    host's k-th core of the allocation), so their ranks never share cores.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    used: Dict[str, int] = {}
+    paths = []
+    for g, group in enumerate(groups):
+        lines = []
+        for host, n in group:
+            first = used.get(host, 0)
+            lines += [f"rank {len(lines) + i}={host} slot={first + i}\n" for i in range(n)]
+            used[host] = first + n
+        path = directory / f"ranks.{g}"
+        path.write_text("".join(lines))
+        paths.append(str(path.resolve()))
+    return paths
+
+
+def placements(groups: Sequence[Hosts], directory: Path, bind: bool = True) -> List[List[str]]:
+    """``mpirun`` options that place each group on its own slots.
+
+    With `bind`, each group gets a rankfile (`write_rankfiles`). Without
+    it, a hostfile and ``--bind-to none``, for allocations whose slot
+    numbering does not match the node's cores.
+    """
+
+    if bind:
+        return [["--rankfile", path] for path in write_rankfiles(groups, directory)]
+    return [["--hostfile", path, "--bind-to", "none"] for path in write_hostfiles(groups, directory)]
+
+
+def local_placement(cpus: Sequence[int]) -> List[str]:
+    """``mpirun`` options for a group of local CPUs the launcher is already pinned to."""
+
+    return ["--host", f"localhost:{len(cpus)}", "--bind-to", "none"]
+
+
+def farm_command(
+    input_path: Path,
+    ranks: int,
+    lmp_bin: str,
+    mpirun: str = "mpirun",
+    mpirun_args: Sequence[str] = (),
+) -> Callable[[Sequence[str]], List[str]]:
+    """Builds the ``mpirun`` line of one input for the placement options of whichever group runs it."""
+
+    input_path = Path(input_path).resolve()
+
+    def command(placement: Sequence[str]) -> List[str]:
+        return [
+            mpirun, "-np", str(ranks), *placement, "-wdir", str(input_path.parent), *mpirun_args,
+            lmp_bin, "-in", input_path.name, "-log", input_path.with_suffix(".log").name,
+        ]
+
+    return command
+
+
+def job_script(
+    scheduler: str,
+    name: str,
+    nodes: int,
+    ppn: int,
+    walltime: str,
+    workdir: Path,
+    farm_script: Path,
+    python: str,
+    pythonpath: str,
+    args: Sequence[str],
+    modules: Sequence[str] = (),
+) -> str:
+    """PBS or Slurm script that runs the farm over the whole allocation."""
+
+    return JOB_SCRIPTS[scheduler].format(
+        name=name,
+        nodes=nodes,
+        ppn=ppn,
+        walltime=walltime,
+        workdir=Path(workdir).resolve(),
+        modules="\n".join(f"module load {m}" for m in modules),
+        pythonpath=pythonpath,
+        python=python,
+        farm_script=Path(farm_script).resolve(),
+        args=shlex.join(args),
+    )
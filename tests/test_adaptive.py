@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eps_biofilm.adaptive import StoppingRule, evaluate, lifetime, next_batch
+
+RULE = StoppingRule(initial=4, batch=2, max_replicates=8, n_boot=500)
+
+
+def runs_of(sample, eps, neps):
+    rows = [{"sample": sample, "arm": "eps", "replicate": r, "lifetime": t} for r, t in enumerate(eps, 1)]
+    rows += [{"sample": sample, "arm": "neps", "replicate": r, "lifetime": t} for r, t in enumerate(neps, 1)]
+    return pd.DataFrame.from_records(rows)
+
+
+def decision(runs, rule=RULE, **kwargs):
+    return evaluate(runs, rule, seed=1, **kwargs).set_index("sample")["decision"].to_dict()
+
+
+def test_level_splits_alpha_over_looks():
+    rule = StoppingRule(initial=10, batch=5, max_replicates=50, alpha=0.05)
+    assert rule.looks == 9
+    assert rule.level == pytest.approx(1 - 0.05 / 9)
+    assert StoppingRule.from_config({"batch": 3, "precision": None}) == StoppingRule(batch=3)
+
+
+def test_lifetime_is_censored_at_the_last_step():
+    assert lifetime({"collapse_step": 120, "last_step": 500}) == 120
+    assert lifetime({"collapse_step": None, "last_step": 500}) == 500
+    assert lifetime({"collapse_step": None, "last_step": None}) is None
+
+
+def test_clear_difference_stops():
+    eps, neps = [1000, 1010, 1020, 1030], [100, 110, 120, 130]
+    assert decision(runs_of(0, eps, neps)) == {0: "eps_longer"}
+    assert decision(runs_of(0, neps, eps)) == {0: "neps_longer"}
+
+
+def test_too_few_seeds_continue_despite_a_difference():
+    assert decision(runs_of(0, [1000, 1010, 1020], [100, 110, 120])) == {0: "continue"}
+
+
+def test_no_difference_continues_up_to_the_budget():
+    same = [100, 300, 200, 400]
+    assert decision(runs_of(0, same, same[::-1])) == {0: "continue"}
+    assert decision(runs_of(0, same * 2, same[::-1] * 2)) == {0: "budget"}
+
+
+def test_failed_runs_keep_their_condition():
+    nan = float("nan")
+    runs = pd.concat([runs_of(0, [nan] * 4, [nan] * 4), runs_of(1, [nan] * 4, [100, 110, 120, 130])])
+    table = evaluate(runs, RULE, seed=1, samples=[0, 1, 2]).set_index("sample")
+    assert table["decision"].to_dict() == {0: "continue", 1: "continue", 2: "continue"}
+    assert table[["n_runs", "n_eps"]].loc[1].tolist() == [4, 0]
+
+    assert next_batch({0: 4, 1: 4, 2: 0}, table.reset_index(), RULE) == {0: range(5, 7), 1: range(5, 7), 2: range(1, 5)}
+
+    spent = runs_of(0, [nan] * 8, [100] * 8)
+    assert decision(spent) == {0: "failed"}
+    assert next_batch({0: 8}, evaluate(spent, RULE, seed=1), RULE) == {}
+
+
+def test_unchanged_conditions_keep_their_decision():
+    rng = np.random.default_rng(0)
+    first = runs_of(0, rng.normal(500, 100, 6), rng.normal(450, 100, 6))
+    other = runs_of(1, rng.normal(500, 100, 6), rng.normal(500, 100, 6))
+    before = evaluate(first, RULE, seed=3).iloc[0]
+    after = evaluate(pd.concat([first, other]), RULE, seed=3).iloc[0]
+    assert before.equals(after)
+
+
+def test_next_batch_respects_initial_batch_and_cap():
+    decisions = pd.DataFrame({"sample": [0, 1, 2], "decision": ["continue", "eps_longer", "continue"]})
+    batches = next_batch({0: 4, 1: 4, 2: 7, 3: 0, 4: 2}, decisions, RULE)
+    assert batches == {0: range(5, 7), 2: range(8, 9), 3: range(1, 5), 4: range(3, 5)}
+    assert next_batch({0: 8}, decisions, RULE) == {}
+    assert next_batch({0: 0}, None, StoppingRule(initial=10, max_replicates=6)) == {0: range(1, 7)}
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from eps_biofilm.clusters import union_find
+
+
+@pytest.mark.parametrize("n, n_pairs", [(1, 0), (10, 0), (200, 150), (1000, 900), (1000, 5000)])
+def test_union_find_matches_scipy(n, n_pairs):
+    rng = np.random.default_rng(n + n_pairs)
+    pairs = rng.integers(0, n, (n_pairs, 2))
+    graph = coo_matrix((np.ones(n_pairs), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    _, components = connected_components(graph, directed=False)
+
+    smallest = np.full(components.max() + 1, n)
+    np.minimum.at(smallest, components, np.arange(n))
+    np.testing.assert_array_equal(union_find(n, pairs), smallest[components])
+
+
+def test_union_find_chain_in_reverse_order():
+    n = 64
+    pairs = np.column_stack([np.arange(n - 1, 0, -1), np.arange(n - 2, -1, -1)])
+    np.testing.assert_array_equal(union_find(n, pairs), np.zeros(n, dtype=int))
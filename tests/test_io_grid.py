@@ -0,0 +1,61 @@
+import mmap
+import zlib
+
+import numpy as np
+import pytest
+
+from eps_biofilm.io_grid import read_vti
+
+SHAPE = (3, 4, 5)  # nz, ny, nx
+
+
+def write_vti(path, fields, compressed=False):
+    """Write ``{name: (nz, ny, nx) float64}`` as CellData of a raw-appended ``.vti`` file."""
+
+    nz, ny, nx = SHAPE
+    tags, blobs, offset = [], [], 0
+    for name, values in fields.items():
+        raw = values.tobytes()
+        if compressed:
+            body = zlib.compress(raw)
+            blob = np.array([1, len(raw), len(raw), len(body)], "<u4").tobytes() + body
+        else:
+            blob = np.array([len(raw)], "<u4").tobytes() + raw
+        tags.append(f'<DataArray type="Float64" Name="{name}" format="appended" offset="{offset}"/>')
+        blobs.append(blob)
+        offset += len(blob)
+    compressor = ' compressor="vtkZLibDataCompressor"' if compressed else ""
+    extent = f"0 {nx} 0 {ny} 0 {nz}"
+    head = (
+        f'<?xml version="1.0"?>\n<VTKFile type="ImageData" version="1.0" byte_order="LittleEndian" '
+        f'header_type="UInt32"{compressor}>\n'
+        f'<ImageData WholeExtent="{extent}" Origin="0 0 1e-06" Spacing="2e-06 2e-06 2e-06">\n'
+        f'<Piece Extent="{extent}">\n<CellData>\n{"".join(tags)}\n</CellData>\n</Piece>\n</ImageData>\n'
+        '<AppendedData encoding="raw">\n_'
+    ).encode()
+    path.write_bytes(head + b"".join(blobs) + b"\n</AppendedData>\n</VTKFile>\n")
+
+
+def mapped(array):
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_read_vti_raw_appended(tmp_path, compressed):
+    rng = np.random.default_rng(0)
+    fields = {"sub": rng.random(SHAPE), "metab1": rng.random(SHAPE)}
+    path = tmp_path / "dump_con_100.vti"
+    write_vti(path, fields, compressed)
+
+    frame, meta = read_vti(path)
+    assert sorted(frame) == sorted(fields)
+    for name, values in fields.items():
+        np.testing.assert_array_equal(frame[name], values)
+        assert mapped(frame[name]) != compressed  # uncompressed files are memory-mapped
+    assert meta["section"] == "CellData" and meta["shape"] == SHAPE
+    np.testing.assert_array_equal(meta["origin"], [0, 0, 1e-6])
+    np.testing.assert_array_equal(meta["spacing"], [2e-6] * 3)
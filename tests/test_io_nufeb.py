@@ -0,0 +1,112 @@
+import base64
+import zlib
+
+import numpy as np
+import pytest
+
+from eps_biofilm.io_nufeb import read_thermo, read_thermo_steps, read_vtu, vtu_type_counts
+
+LOG = """LAMMPS (NUFEB)
+Step CPU Atoms v_ncross1 v_ncross2
+0 0 150 50 50
+10 1 151 60 61
+20 2 152 70 72
+Loop time of 2 on 1 procs for 20 steps with 152 atoms
+"""
+
+
+def test_read_thermo_steps_last_longer_than_log(tmp_path):
+    log = tmp_path / "run.log"
+    log.write_text(LOG)
+
+    assert read_thermo_steps(log, last=8)["Step"].tolist() == [0, 10, 20]
+    assert read_thermo_steps(log, last=2)["Step"].tolist() == [10, 20]
+    assert read_thermo_steps(log, last=8).equals(read_thermo(log))
+
+
+def _vtk_blocks(values, header, compressed, block_size=160):
+    """Binary header and body of one DataArray, as VTK writes them."""
+
+    raw = values.tobytes()
+    if not compressed:
+        return np.array([len(raw)], header).tobytes(), raw
+    blocks = [zlib.compress(raw[k:k + block_size]) for k in range(0, len(raw), block_size)]
+    sizes = [len(blocks), block_size, len(raw) % block_size] + [len(b) for b in blocks]
+    return np.array(sizes, header).tobytes(), b"".join(blocks)
+
+
+def write_vtu(path, arrays, encoding, compressed, header_type):
+    """Write `arrays` (``[(section, name, values)]``) as a ``.vtu`` file with the given encoding."""
+
+    header = np.dtype("<" + {"UInt32": "u4", "UInt64": "u8"}[header_type])
+    types = {"i4": "Int32", "i8": "Int64", "f4": "Float32", "f8": "Float64"}
+    sections = {"PointData": [], "Points": []}
+    appended, offset = [], 0
+    for section, name, values in arrays:
+        n_comp = values.shape[1] if values.ndim > 1 else 1
+        attrs = f'type="{types[values.dtype.str[1:]]}" Name="{name}" NumberOfComponents="{n_comp}"'
+        head, body = _vtk_blocks(values, header, compressed)
+        if encoding == "ascii":
+            tag = f'<DataArray {attrs} format="ascii">\n{" ".join(map(str, values.ravel().tolist()))}\n</DataArray>'
+        elif encoding in ("binary", "binary-joint"):
+            if encoding == "binary-joint":
+                text = base64.b64encode(head + body)
+            else:
+                text = base64.b64encode(head) + base64.b64encode(body)
+            tag = f'<DataArray {attrs} format="binary">\n{text.decode()}\n</DataArray>'
+        else:
+            blob = head + body if encoding == "raw" else base64.b64encode(head) + base64.b64encode(body)
+            tag = f'<DataArray {attrs} format="appended" offset="{offset}"/>'
+            appended.append(blob)
+            offset += len(blob)
+        sections[section].append(tag)
+
+    compressor = ' compressor="vtkZLibDataCompressor"' if compressed else ""
+    xml = (
+        f'<?xml version="1.0"?>\n<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" '
+        f'header_type="{header_type}"{compressor}>\n<UnstructuredGrid>\n'
+        f'<Piece NumberOfPoints="{len(arrays[0][2])}" NumberOfCells="0">\n'
+        f'<PointData>\n{"".join(sections["PointData"])}\n</PointData>\n'
+        f'<Points>\n{"".join(sections["Points"])}\n</Points>\n'
+        "</Piece>\n</UnstructuredGrid>\n"
+    ).encode()
+    if appended:
+        enc = "raw" if encoding == "raw" else "base64"
+        xml += f'<AppendedData encoding="{enc}">\n_'.encode() + b"".join(appended) + b"\n</AppendedData>\n"
+    path.write_bytes(xml + b"</VTKFile>\n")
+
+
+VTU_CASES = [
+    (encoding, compressed, header_type)
+    for encoding in ("ascii", "binary", "binary-joint", "raw", "base64")
+    for compressed in (False, True)
+    for header_type in ("UInt32", "UInt64")
+    if not (encoding == "ascii" and (compressed or header_type == "UInt64"))
+]
+
+
+@pytest.mark.parametrize("encoding, compressed, header_type", VTU_CASES)
+def test_read_vtu_encodings(tmp_path, encoding, compressed, header_type):
+    rng = np.random.default_rng(0)
+    n = 50
+    source = {
+        "id": np.arange(1, n + 1, dtype=np.int64),
+        "type": rng.integers(1, 6, n).astype(np.int32),
+        "diameter": rng.uniform(1e-6, 2e-6, n),
+        "outer_diameter": rng.uniform(1e-6, 3e-6, n).astype(np.float32),
+    }
+    points = rng.uniform(0, 1e-4, (n, 3))
+    path = tmp_path / "dump100.vtu"
+    arrays = [("PointData", name, values) for name, values in source.items()] + [("Points", "Points", points)]
+    write_vtu(path, arrays, encoding, compressed, header_type)
+
+    frame = read_vtu(path)
+    for name in ("id", "type", "diameter"):
+        np.testing.assert_array_equal(frame[name], source[name])
+    np.testing.assert_array_equal(frame.extra["outer_diameter"], source["outer_diameter"])
+    for k, axis in enumerate("xyz"):
+        np.testing.assert_array_equal(frame[axis], points[:, k])
+        assert frame[axis].flags.c_contiguous
+    np.testing.assert_array_equal(vtu_type_counts(path, 6), np.bincount(source["type"], minlength=6))
+    if encoding == "raw" and not compressed:
+        assert not frame.type.flags.owndata  # a view on the file buffer